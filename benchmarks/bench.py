@@ -0,0 +1,392 @@
+"""
+Офлайн-бенчмарк режимов парсера на локальном сервере-заменителе.
+
+Локальный сервер отдает записанные страницы docs.python.org и
+peps.python.org из каталога <pages>/<хост>/<путь> с заданной задержкой
+и разбросом. Каждый режим запускается в отдельном процессе с холодным
+и с прогретым кешем; в отчете - страниц в секунду, p50/p99 задержки
+запроса и пиковое потребление памяти (RSS).
+
+# Записать страницы из кеша парсера (после обычных запусков режимов).
+(venv) ...$ python benchmarks/bench.py record --cache src/http_cache.sqlite
+# Или сгенерировать синтетические страницы.
+(venv) ...$ python benchmarks/bench.py synth --peps 600
+# Прогон всех режимов, сохранение результатов и сравнение с эталоном.
+(venv) ...$ python benchmarks/bench.py run --latency 0.05 --jitter 0.02 \\
+    --json bench.json --compare baseline.json
+# Отдавать страницы из снимка, записанного парсером с --record.
+(venv) ...$ python benchmarks/bench.py run --snapshot snapshots/2024-05
+# Передать режимам параметры парсера.
+(venv) ...$ python benchmarks/bench.py run --modes pep -- -w 16 -p 4
+"""
+import argparse
+import inspect
+import json
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+PAGES_DIR = BENCH_DIR / 'pages'
+MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+SCENARIOS = ('cold', 'warm')
+ARCHIVE_SIZE = 2 ** 20
+
+
+def page_path(pages_dir, url):
+    """Файл записанной страницы для адреса."""
+    parts = urlsplit(url)
+    path = parts.path if not parts.path.endswith('/') else (
+        parts.path + 'index.html'
+    )
+    return pages_dir / parts.hostname / path.lstrip('/')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Отдает записанные страницы с задержкой; архивы .zip, которых нет
+    среди записанных, заменяет нулевыми байтами размера archive_size.
+    Если задан снимок, сначала ищет страницу в нем."""
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят отдельными записями в сокет: без TCP_NODELAY
+    # алгоритм Нейгла вместе с отложенным ACK добавляет ~40 мс к каждому
+    # запросу keep-alive, и задержки в отчете отражают его, а не latency.
+    disable_nagle_algorithm = True
+    pages_dir = PAGES_DIR
+    snapshot = None
+    latency = 0
+    jitter = 0
+    archive_size = ARCHIVE_SIZE
+
+    def body(self):
+        if self.snapshot is not None:
+            record = self.snapshot.get(
+                'GET', 'https://' + self.path.lstrip('/')
+            )
+            if record is not None:
+                return record[1]
+        path = self.pages_dir / self.path.lstrip('/')
+        if path.is_dir() or self.path.endswith('/'):
+            path = path / 'index.html'
+        if path.is_file():
+            return path.read_bytes()
+        if path.suffix == '.zip':
+            return bytes(self.archive_size)
+        return None
+
+    def respond(self, with_body):
+        time.sleep(max(0, random.uniform(
+            self.latency - self.jitter, self.latency + self.jitter
+        )))
+        body = self.body()
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{len(body)}"'
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') in (etag, None):
+            start = int(range_header[len('bytes='):].split('-')[0])
+        self.send_response(206 if start else 200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body) - start))
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body[start:])
+
+    def do_GET(self):
+        self.respond(with_body=True)
+
+    def do_HEAD(self):
+        self.respond(with_body=False)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(pages_dir, latency, jitter, archive_size=ARCHIVE_SIZE,
+                 snapshot=None):
+    """Запускает сервер-заменитель в фоновом потоке."""
+    handler = type('Handler', (StandInHandler,), {
+        'pages_dir': pages_dir,
+        'snapshot': snapshot,
+        'latency': latency,
+        'jitter': jitter,
+        'archive_size': archive_size,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f'http://127.0.0.1:{server.server_port}/'
+    return server
+
+
+def record(args):
+    """Сохраняет страницы из кеша парсера в каталог страниц."""
+    from requests_cache import CachedSession
+
+    session = CachedSession(str(args.cache).replace('.sqlite', ''))
+    count = 0
+    for response in session.cache.responses.values():
+        if response.status_code != 200 or response.request.method != 'GET':
+            continue
+        path = page_path(args.pages, response.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(response.content)
+        count += 1
+    print(f'Записано страниц: {count} в {args.pages}')
+
+
+def synth(args):
+    """Генерирует синтетические страницы в разметке docs/peps.python.org."""
+    filler = '<p>Lorem ipsum <a href="#">dolor</a> sit amet.</p>' * 200
+    pages = {}
+    versions = [f'3.{minor}' for minor in range(12, 0, -1)]
+    pages['docs.python.org/3/whatsnew/index.html'] = (
+        '<html><body><section id="what-s-new-in-python">'
+        '<div class="toctree-wrapper compound"><ul>' + ''.join(
+            f'<li class="toctree-l1"><a href="{v}.html">Python {v}</a></li>'
+            for v in versions
+        ) + '</ul></div></section></body></html>'
+    )
+    for version in versions:
+        pages[f'docs.python.org/3/whatsnew/{version}.html'] = (
+            f'<html><body>{filler}<section><h1>What’s New In Python '
+            f'{version}</h1><dl class="field-list simple"><dt>Editor</dt>'
+            f'<dd>Guido</dd></dl>{filler}</section></body></html>'
+        )
+    pages['docs.python.org/3/index.html'] = (
+        '<html><body><div class="sphinxsidebarwrapper"><ul>' + ''.join(
+            f'<li><a href="https://docs.python.org/{v}/">Python {v} '
+            '(stable)</a></li>' for v in versions
+        ) + '<li><a href="https://www.python.org/doc/versions/">'
+        'All versions</a></li></ul></div></body></html>'
+    )
+    pages['docs.python.org/3/download.html'] = (
+        '<html><body><table class="docutils"><tr><td>'
+        '<a href="archives/python-docs-pdf-a4.zip">PDF</a>'
+        '</td></tr></table></body></html>'
+    )
+    statuses = (('A', 'Active'), ('F', 'Final'), ('R', 'Rejected'))
+    rows = []
+    for number in range(1, args.peps + 1):
+        abbr, status = statuses[number % len(statuses)]
+        rows.append(
+            f'<tr><td><abbr>S{abbr}</abbr></td><td><a class="pep reference '
+            f'internal" href="pep-{number:04d}/">{number}</a></td></tr>'
+        )
+        pages[f'peps.python.org/pep-{number:04d}/index.html'] = (
+            f'<html><body>{filler}<dl class="rfc2822 field-list simple">'
+            f'<dt>Status<span>:</span></dt>\n<dd>{status}</dd></dl>'
+            f'{filler}</body></html>'
+        )
+    pages['peps.python.org/index.html'] = (
+        '<html><body><section id="numerical-index"><table><tr><th>PEP</th>'
+        f'</tr>{"".join(rows)}</table></section></body></html>'
+    )
+    for name, html in pages.items():
+        path = args.pages / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding='utf-8')
+    print(f'Сгенерировано страниц: {len(pages)} в {args.pages}')
+
+
+def timed(function, latencies):
+    """Оборачивает функцию запроса замером задержки."""
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+        return async_wrapper
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def scenario(args):
+    """Один прогон режима (в отдельном процессе): печатает JSON метрик."""
+    sys.path.insert(0, str(SRC_DIR))
+    import async_utils
+    import configs
+    import main
+
+    latencies = []
+    async_utils.get_response_async = timed(
+        async_utils.get_response_async, latencies
+    )
+    main.MAIN_DOC_URL = f'{args.server}docs.python.org/3/'
+    main.PEPS_URL = f'{args.server}peps.python.org/'
+    main.BASE_DIR = args.workdir
+    configs.CACHE_NAME = str(args.workdir / 'http_cache')
+    cli_args = configs.configure_argument_parser(MODES).parse_args(
+        [args.mode, '--rate', '0', *args.parser_args]
+    )
+    session = configs.configure_session(cli_args)
+    # Все синхронные запросы сессии, включая HEAD и загрузку архивов
+    # в download_utils (для потоковых - до получения заголовков ответа).
+    session.request = timed(session.request, latencies)
+    started = time.perf_counter()
+    results = main.MODE_TO_FUNCTION[args.mode](session, cli_args)
+    if results is not None:
+        results = list(results)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'pages_per_sec': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_rss_mb': resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss / 1024,
+    }))
+
+
+def percentile(values, percent):
+    """Перцентиль выборки (0 для пустой)."""
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def run_scenario(server, mode, workdir, parser_args):
+    """Запускает прогон режима в отдельном процессе, чтобы пиковый RSS
+    относился только к этому прогону."""
+    completed = subprocess.run(
+        [
+            sys.executable, __file__, 'scenario', mode,
+            '--server', server.url, '--workdir', str(workdir),
+            '--', *parser_args
+        ],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(args):
+    """Прогоняет режимы с холодным и прогретым кешем, печатает отчет."""
+    from prettytable import PrettyTable
+
+    snapshot = None
+    if args.snapshot:
+        sys.path.insert(0, str(SRC_DIR))
+        from snapshots import SnapshotReader
+        snapshot = SnapshotReader(args.snapshot)
+    server = start_server(
+        args.pages, args.latency, args.jitter, snapshot=snapshot
+    )
+    results = {}
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in SCENARIOS:
+                results[f'{mode}/{name}'] = run_scenario(
+                    server, mode, Path(workdir), args.parser_args
+                )
+    server.shutdown()
+    table = PrettyTable()
+    table.field_names = (
+        'Прогон', 'Запросов', 'Время, с', 'Стр/с', 'p50, мс', 'p99, мс',
+        'RSS, МБ'
+    )
+    table.align = 'l'
+    for name, metrics in results.items():
+        table.add_row((
+            name, metrics['requests'], f'{metrics["seconds"]:.2f}',
+            f'{metrics["pages_per_sec"]:.1f}', f'{metrics["p50_ms"]:.1f}',
+            f'{metrics["p99_ms"]:.1f}', f'{metrics["peak_rss_mb"]:.1f}'
+        ))
+    print(table)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if args.compare:
+        return compare(results, args.compare, args.tolerance)
+    return 0
+
+
+def compare(results, baseline_path, tolerance):
+    """Сравнивает с эталоном: код 1, если какой-то прогон стал медленнее
+    или требует больше памяти, чем допускает tolerance."""
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        if metrics['pages_per_sec'] < (
+            baseline[name]['pages_per_sec'] * (1 - tolerance)
+        ):
+            regressions.append(f'{name}: pages/sec')
+        if metrics['peak_rss_mb'] > (
+            baseline[name]['peak_rss_mb'] * (1 + tolerance)
+        ):
+            regressions.append(f'{name}: peak RSS')
+    for regression in regressions:
+        print(f'Регрессия: {regression}')
+    return 1 if regressions else 0
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help='Записать страницы')
+    record_parser.add_argument(
+        '--cache', type=Path, default=SRC_DIR / 'http_cache.sqlite'
+    )
+    synth_parser = commands.add_parser(
+        'synth', help='Сгенерировать страницы'
+    )
+    synth_parser.add_argument('--peps', type=int, default=600)
+    run_parser = commands.add_parser('run', help='Прогнать режимы')
+    run_parser.add_argument(
+        '--modes', nargs='+', choices=MODES, default=list(MODES)
+    )
+    run_parser.add_argument('--latency', type=float, default=0.02)
+    run_parser.add_argument('--jitter', type=float, default=0.01)
+    run_parser.add_argument('--json', type=Path)
+    run_parser.add_argument('--compare', type=Path)
+    run_parser.add_argument('--tolerance', type=float, default=0.2)
+    run_parser.add_argument('--snapshot', type=Path)
+    scenario_parser = commands.add_parser('scenario')
+    scenario_parser.add_argument('mode', choices=MODES)
+    scenario_parser.add_argument('--server', required=True)
+    scenario_parser.add_argument('--workdir', type=Path, required=True)
+    for command in (record_parser, synth_parser, run_parser):
+        command.add_argument('--pages', type=Path, default=PAGES_DIR)
+    return parser
+
+
+COMMANDS = {
+    'record': record,
+    'synth': synth,
+    'run': run,
+    'scenario': scenario,
+}
+
+
+if __name__ == '__main__':
+    # Все, что после --, передается режимам парсера.
+    cli_args, parser_args = configure_argument_parser().parse_known_args()
+    cli_args.parser_args = [arg for arg in parser_args if arg != '--']
+    sys.exit(COMMANDS[cli_args.command](cli_args) or 0)
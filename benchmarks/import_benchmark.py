@@ -0,0 +1,186 @@
+"""
+Время запуска парсера: справка, импорт main и запуск режимов из кеша.
+
+Каждый сценарий запускается в новом процессе интерпретатора --runs раз,
+в отчете - медиана времени процесса и самые дорогие модули
+по -X importtime. С --rev сценарии прогоняются и на другой ревизии
+(через git worktree), чтобы сравнить время запуска до и после изменений.
+Режимы запускаются на копии src с копией кеша парсера (--cache), в которой
+ни один ответ не устарел, поэтому страницы читаются без сети на любой
+ревизии, а файлы результатов и состояния рабочего дерева не меняются.
+
+(venv) ...$ python benchmarks/import_benchmark.py
+(venv) ...$ python benchmarks/import_benchmark.py --runs 20 --rev HEAD~1
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CACHE_FILE = 'http_cache.sqlite'
+# Режимы, страницы которых есть в кеше после обычных запусков
+# (архивы download в кеш не попадают).
+MODES = ('whats-new', 'latest-versions', 'pep')
+# Сценарии, которые есть на любой ревизии: main.py и его режимы.
+SCENARIOS = {
+    'main.py -h': ['main.py', '-h'],
+    'import main': ['-c', 'import main'],
+}
+CACHE_SCENARIOS = {
+    f'main.py {mode} из кеша': ['main.py', mode] for mode in MODES
+}
+# Что не копируется из src: кеш, результаты и состояние прошлых запусков.
+IGNORE = shutil.ignore_patterns(
+    '__pycache__', 'http_cache*', '*.sqlite3', 'results', 'logs',
+    'downloads', 'state', 'snapshots'
+)
+
+
+def run_once(src_dir, command, importtime=False):
+    """Запускает сценарий, возвращает (секунды, stderr, код возврата)."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *(['-X', 'importtime'] if importtime else []),
+         *command],
+        cwd=src_dir, capture_output=True, text=True
+    )
+    return (
+        time.perf_counter() - started, completed.stderr, completed.returncode
+    )
+
+
+def error_line(stderr, returncode):
+    """Причина ошибки сценария: последняя строка stderr."""
+    lines = stderr.strip().splitlines()
+    return lines[-1] if lines else f'код возврата {returncode}'
+
+
+def heaviest_modules(stderr, top):
+    """Модули верхнего уровня с наибольшим суммарным временем импорта."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  '):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def fresh_cache(cache_path, target):
+    """Копирует кеш парсера в target и снимает срок годности со всех
+    ответов: режим на любой ревизии возьмет страницы из кеша без сети."""
+    from requests_cache import CachedSession
+
+    shutil.copy(cache_path, target)
+    session = CachedSession(str(target).replace('.sqlite', ''))
+    responses = session.cache.responses
+    for key in list(responses.keys()):
+        response = responses[key]
+        response.expires = None
+        responses[key] = response
+    session.close()
+
+
+def measure(src_dir, runs, top, cache_path=None):
+    """Медиана времени и самые дорогие модули каждого сценария на копии
+    src_dir. Сценарии режимов запускаются, только если есть кеш.
+    Сценарий, завершившийся с ошибкой, не замеряется:
+    (None, причина ошибки)."""
+    scenarios = dict(SCENARIOS)
+    with tempfile.TemporaryDirectory() as workdir:
+        run_dir = Path(workdir) / 'src'
+        shutil.copytree(src_dir, run_dir, ignore=IGNORE)
+        if cache_path is not None:
+            fresh_cache(cache_path, run_dir / CACHE_FILE)
+            scenarios.update(CACHE_SCENARIOS)
+        return {
+            name: measure_scenario(run_dir, command, runs, top)
+            for name, command in scenarios.items()
+        }
+
+
+def measure_scenario(run_dir, command, runs, top):
+    """(медиана секунд, самые дорогие модули) или (None, причина ошибки).
+    """
+    _, importtime, returncode = run_once(run_dir, command, importtime=True)
+    if returncode:
+        return None, error_line(importtime, returncode)
+    seconds = []
+    for _ in range(runs):
+        elapsed, stderr, returncode = run_once(run_dir, command)
+        if returncode:
+            return None, error_line(stderr, returncode)
+        seconds.append(elapsed)
+    return statistics.median(seconds), heaviest_modules(importtime, top)
+
+
+def measure_revision(revision, runs, top, cache_path=None):
+    """Замер на другой ревизии во временном git worktree."""
+    with tempfile.TemporaryDirectory() as workdir:
+        subprocess.run(
+            ['git', 'worktree', 'add', '--detach', workdir, revision],
+            cwd=ROOT_DIR, check=True, capture_output=True
+        )
+        try:
+            return measure(Path(workdir) / 'src', runs, top, cache_path)
+        finally:
+            subprocess.run(
+                ['git', 'worktree', 'remove', '--force', workdir],
+                cwd=ROOT_DIR, capture_output=True
+            )
+
+
+def milliseconds(seconds):
+    """Ячейка отчета: время в мс или «ошибка» для невыполненного сценария.
+    """
+    return 'ошибка' if seconds is None else f'{seconds * 1000:.0f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-r', '--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--rev', help='Ревизия git для сравнения')
+    parser.add_argument(
+        '--cache', type=Path, default=ROOT_DIR / 'src' / CACHE_FILE,
+        help='Кеш парсера со страницами режимов'
+    )
+    args = parser.parse_args()
+    cache_path = args.cache if args.cache.exists() else None
+    if cache_path is None:
+        print(f'Нет кеша {args.cache}: режимы не замеряются')
+    current = measure(ROOT_DIR / 'src', args.runs, args.top, cache_path)
+    baseline = measure_revision(
+        args.rev, args.runs, args.top, cache_path
+    ) if args.rev else {}
+    table = PrettyTable()
+    table.field_names = (
+        'Сценарий', 'Медиана, мс', f'{args.rev or "-"}, мс',
+        'Самые дорогие модули, мс'
+    )
+    table.align = 'l'
+    for name, (seconds, modules) in current.items():
+        table.add_row((
+            name,
+            milliseconds(seconds),
+            milliseconds(baseline[name][0]) if name in baseline else '',
+            modules if seconds is None else ', '.join(
+                f'{module} {ms:.0f}' for ms, module in modules
+            ),
+        ))
+    print(table)
+    for name, (seconds, error) in baseline.items():
+        if seconds is None:
+            print(f'{args.rev}: сценарий «{name}» не выполнен: {error}')
+
+
+if __name__ == '__main__':
+    main()
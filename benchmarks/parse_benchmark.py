@@ -0,0 +1,123 @@
+"""
+Сравнение полного и частичного разбора страниц на записанных страницах.
+
+Страницы берутся из кеша парсера (src/http_cache.sqlite после обычного
+запуска режимов) или из каталога с подкаталогами по ключам PAGE_PATTERNS
+(whats-new/, pep/, pep-index/ ...), в которых лежат *.html.
+
+(venv) ...$ python benchmarks/parse_benchmark.py
+(venv) ...$ python benchmarks/parse_benchmark.py --pages recorded/ -r 5
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+# Страница: функция разбора из parsers и шаблон адреса страницы в кеше.
+PAGE_PATTERNS = {
+    'whats-new-index': (
+        'extract_whats_new_links', re.compile(r'/3/whatsnew/$')
+    ),
+    'whats-new': (
+        'extract_whats_new', re.compile(r'/whatsnew/\d+\.\d+\.html$')
+    ),
+    'latest-versions': (
+        'extract_latest_versions', re.compile(r'docs\.python\.org/3/$')
+    ),
+    'download': (
+        'extract_download_links', re.compile(r'/3/download\.html$')
+    ),
+    'pep-index': ('extract_pep_index', re.compile(r'peps\.python\.org/$')),
+    'pep': (
+        'extract_pep_status', re.compile(r'peps\.python\.org/pep-\d+/$')
+    ),
+}
+
+
+def pages_from_cache(cache_path):
+    """Страницы режимов из кеша requests_cache."""
+    from requests_cache import CachedSession
+
+    pages = {mode: [] for mode in PAGE_PATTERNS}
+    session = CachedSession(str(cache_path).replace('.sqlite', ''))
+    for response in session.cache.responses.values():
+        for mode, (_, pattern) in PAGE_PATTERNS.items():
+            if pattern.search(response.url):
+                response.encoding = 'utf-8'
+                pages[mode].append(response.text)
+    return pages
+
+
+def pages_from_dir(pages_dir):
+    """Страницы режимов из каталога с записанными страницами."""
+    return {
+        mode: [
+            path.read_text(encoding='utf-8')
+            for path in sorted((pages_dir / mode).glob('*.html'))
+        ]
+        for mode in PAGE_PATTERNS
+    }
+
+
+def bench(extractor, pages, parse, repeat):
+    """Лучшее время разбора всех страниц из repeat повторов."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = [extractor(page, parse=parse) for page in pages]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, records
+
+
+def main():
+    sys.path.append(str(SRC_DIR))
+    import parsers
+    from constants import PARSE_FULL, PARSE_PARTIAL, PARSE_XPATH
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--cache', type=Path, default=SRC_DIR / 'http_cache.sqlite',
+        help='Файл кеша парсера с записанными страницами'
+    )
+    parser.add_argument(
+        '--pages', type=Path, help='Каталог с записанными страницами'
+    )
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=3, help='Количество повторов'
+    )
+    args = parser.parse_args()
+    pages = pages_from_dir(args.pages) if args.pages else (
+        pages_from_cache(args.cache)
+    )
+    table = PrettyTable()
+    table.field_names = (
+        'Режим', 'Разбор', 'Страниц', 'Всего, с', 'На страницу, мс',
+        'Ускорение', 'Совпадает'
+    )
+    table.align = 'l'
+    for mode, (name, _) in PAGE_PATTERNS.items():
+        if not pages[mode]:
+            continue
+        extractor = getattr(parsers, name)
+        full_time, full_records = None, None
+        for parse in (PARSE_FULL, PARSE_PARTIAL, PARSE_XPATH):
+            elapsed, records = bench(
+                extractor, pages[mode], parse, args.repeat
+            )
+            if parse == PARSE_FULL:
+                full_time, full_records = elapsed, records
+            table.add_row((
+                mode, parse, len(pages[mode]), f'{elapsed:.3f}',
+                f'{elapsed / len(pages[mode]) * 1000:.2f}',
+                f'{full_time / elapsed:.1f}x', records == full_records
+            ))
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
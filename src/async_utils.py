@@ -0,0 +1,253 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from itertools import islice
+from urllib.parse import urlsplit
+
+import aiohttp
+from requests import Request
+from requests.hooks import dispatch_hook
+from requests_cache.policy.expiration import (get_expiration_datetime,
+                                              get_expiration_seconds,
+                                              get_url_expiration, utcnow)
+
+from constants import INFO_URL_UNAVAILABLE, RETRY_STATUSES, STAGE_FETCH
+from metrics import metrics, observe_response
+from transport import (get_pool_size, get_rate_limiter, get_retry,
+                       get_timeout, keep_alive, next_retry)
+from utils import build_response, get_pages
+
+
+def get_expires(session, url):
+    """Срок годности ответа по правилам устаревания сессии."""
+    expire_after = get_url_expiration(url, session.settings.urls_expire_after)
+    if expire_after is None:
+        expire_after = session.settings.expire_after
+    return get_expiration_datetime(expire_after)
+
+
+def save_to_cache(session, cache_key, response):
+    """Сохраняет ответ в кеш по тем же правилам, что и CachedSession."""
+    if response.status_code not in session.settings.allowable_codes:
+        return
+    filter_fn = session.settings.filter_fn
+    if filter_fn is not None and not filter_fn(response):
+        return
+    session.cache.save_response(
+        response, cache_key, get_expires(session, response.url)
+    )
+
+
+def usable_if_error(session, cached):
+    """Можно ли при ошибке отдать устаревший ответ из кеша: stale_if_error
+    сессии - True или срок, на который ответ может устареть."""
+    stale_if_error = session.settings.stale_if_error
+    if cached is None or not stale_if_error:
+        return False
+    if stale_if_error is True or cached.expires is None:
+        return True
+    return utcnow() < cached.expires + timedelta(
+        seconds=get_expiration_seconds(stale_if_error)
+    )
+
+
+def validation_headers(cached):
+    """Заголовки условного запроса для устаревшего ответа из кеша."""
+    headers = {}
+    if cached is None:
+        return headers
+    if 'ETag' in cached.headers:
+        headers['If-None-Match'] = cached.headers['ETag']
+    if 'Last-Modified' in cached.headers:
+        headers['If-Modified-Since'] = cached.headers['Last-Modified']
+    return headers
+
+
+async def send_once(session, client, url, headers):
+    """Выполняет запрос через планировщик запросов сессии."""
+    rate_limiter = get_rate_limiter(session, url)
+    host = urlsplit(url).hostname
+    if rate_limiter is not None:
+        await asyncio.sleep(rate_limiter.reserve(host))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        async with client.get(url, headers=headers) as raw:
+            content = await raw.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        if rate_limiter is not None:
+            rate_limiter.feedback(host)
+        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url, error))
+    if rate_limiter is not None:
+        rate_limiter.feedback(
+            host, raw.status, raw.headers.get('Retry-After')
+        )
+    return raw, content, timedelta(seconds=loop.time() - started)
+
+
+async def send_request(session, client, url, headers):
+    """Выполняет запрос с повторами по политике сессии (--retries,
+    --backoff): ошибки соединения и ответы RETRY_STATUSES повторяются
+    с экспоненциальной задержкой и случайным разбросом, как у JitterRetry.
+    Если повторы исчерпаны, возвращает последний ответ или поднимает
+    последнюю ошибку."""
+    retry = get_retry(session, url)
+    while True:
+        error = status = None
+        try:
+            raw, content, elapsed = await send_once(
+                session, client, url, headers
+            )
+        except ConnectionError as failure:
+            error = failure
+        else:
+            status = raw.status
+            if status not in RETRY_STATUSES:
+                return raw, content, elapsed
+        retry = next_retry(retry, url, status, error)
+        if retry is None:
+            if error is not None:
+                raise error
+            return raw, content, elapsed
+        await asyncio.sleep(retry.get_backoff_time())
+
+
+async def get_response_async(session, client, url, charset='utf-8'):
+    """Асинхронный аналог get_response: читает и пишет кеш сессии,
+    устаревшие ответы перепроверяет условным запросом. Как и CachedSession
+    со stale_if_error, при ошибке соединения или ответе с кодом не из
+    allowable_codes отдает устаревший ответ из кеша."""
+    request = session.prepare_request(Request('GET', url))
+    cache_key = session.cache.create_key(request)
+    cached = session.cache.get_response(cache_key)
+    if cached is not None and not cached.is_expired:
+        cached.encoding = charset
+        return dispatch_hook('response', session.hooks, cached)
+    try:
+        raw, content, elapsed = await send_request(
+            session, client, url, validation_headers(cached)
+        )
+    except ConnectionError:
+        if not usable_if_error(session, cached):
+            raise
+        raw = None
+    if raw is None or (
+        raw.status != 304
+        and raw.status not in session.settings.allowable_codes
+        and usable_if_error(session, cached)
+    ):
+        cached.encoding = charset
+        return dispatch_hook('response', session.hooks, cached)
+    if raw.status == 304 and cached is not None:
+        cached.headers.update(raw.headers)
+        session.cache.save_response(
+            cached, cache_key, get_expires(session, url)
+        )
+        cached.encoding = charset
+        return dispatch_hook('response', session.hooks, cached)
+    response = build_response(
+        request,
+        raw.status,
+        raw.reason,
+        dict(raw.headers),
+        content,
+        elapsed,
+    )
+    save_to_cache(session, cache_key, response)
+    response.encoding = charset
+    return dispatch_hook('response', session.hooks, response)
+
+
+async def fetch_pages(session, urls, workers, results, stop):
+    """Держит в полете до workers запросов из одного потока и кладет
+    кортежи (ссылка, текст, ошибка) в очередь results в исходном порядке.
+    Загружено, но не отдано не больше 2 * workers страниц сверх очереди.
+    Останавливается, когда выставлено событие stop."""
+    async def fetch(client, url):
+        started = time.perf_counter()
+        try:
+            response = await get_response_async(session, client, url)
+        except ConnectionError as error:
+            metrics.observe(
+                STAGE_FETCH, time.perf_counter() - started, error=True
+            )
+            return url, None, error
+        observe_response(response, time.perf_counter() - started)
+        return url, response.text, None
+
+    loop = asyncio.get_running_loop()
+    connect_timeout, read_timeout = get_timeout(session, urls[0])
+    # workers - запросов в полете всего, --pool-size - соединений к хосту.
+    connector = aiohttp.TCPConnector(
+        limit=workers,
+        limit_per_host=get_pool_size(session, urls[0]),
+        force_close=not keep_alive(session),
+    )
+    async with aiohttp.ClientSession(
+        connector=connector,
+        headers=session.headers,
+        timeout=aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        ),
+    ) as client:
+        waiting = iter(urls)
+        pending = deque(
+            asyncio.ensure_future(fetch(client, url))
+            for url in islice(waiting, 2 * workers)
+        )
+        try:
+            while pending and not stop.is_set():
+                page = await pending.popleft()
+                for url in islice(waiting, 1):
+                    pending.append(asyncio.ensure_future(fetch(client, url)))
+                # Блокирующая запись в очередь вне цикла событий: пока
+                # потребитель разбирает страницы, запросы продолжаются.
+                await loop.run_in_executor(None, results.put, page)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def get_pages_async(session, urls, workers=1):
+    """Асинхронный аналог get_pages: отдает кортежи
+    (ссылка, текст, ошибка) в порядке исходного списка по мере загрузки.
+    Цикл событий работает в фоновом потоке и передает страницы через
+    ограниченную очередь, поэтому в памяти не копится весь обход.
+    При воспроизведении снимка сеть не нужна, и страницы читаются
+    синхронным движком."""
+    if not urls:
+        return
+    if getattr(session.get_adapter(urls[0]), 'offline', False):
+        yield from get_pages(session, urls, workers)
+        return
+    workers = max(workers, 1)
+    results = queue.Queue(maxsize=workers)
+    stop = threading.Event()
+
+    def run():
+        try:
+            asyncio.run(fetch_pages(session, urls, workers, results, stop))
+        except BaseException as error:
+            results.put(error)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        for _ in urls:
+            page = results.get()
+            if isinstance(page, BaseException):
+                raise page
+            yield page
+    finally:
+        stop.set()
+        # Освобождаем очередь, чтобы фоновый поток не ждал потребителя.
+        while thread.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
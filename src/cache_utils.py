@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+
+ACCESS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS access (
+    key TEXT PRIMARY KEY,
+    accessed REAL NOT NULL
+)
+'''
+TOUCH = '''
+INSERT INTO access (key, accessed) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET accessed = excluded.accessed
+'''
+# Сначала ответы, к которым дольше всего не обращались (без записи - раньше
+# всех).
+LRU_ORDER = '''
+SELECT responses.key, length(responses.value)
+FROM responses LEFT JOIN access ON access.key = responses.key
+ORDER BY COALESCE(access.accessed, 0)
+'''
+TEXT_TYPES = ('text/', 'json', 'xml', 'javascript')
+
+
+def cacheable(response, max_response=0):
+    """filter_fn сессии: не кешировать двоичные ответы больше max_response
+    байт (0 - кешировать все). requests_cache вызывает фильтр и для
+    потоковых загрузок с Cache-Control: no-store: такие ответы и двоичные
+    ответы без Content-Length, тело которых еще не прочитано, отклоняются
+    без чтения тела, чтобы не загружать архив в память."""
+    request = response.request
+    if request is not None and (
+        request.headers.get('Cache-Control') == 'no-store'
+    ):
+        return False
+    if not max_response:
+        return True
+    content_type = response.headers.get('Content-Type', '')
+    if any(text_type in content_type for text_type in TEXT_TYPES):
+        return True
+    size = response.headers.get('Content-Length')
+    if not size and not getattr(response, '_content_consumed', True):
+        return False
+    return int(size if size else len(response.content)) <= max_response
+
+
+def cache_db_path(session):
+    """Файл кеша, если сессия хранит кеш в SQLite, иначе None."""
+    return getattr(session.cache.responses, 'db_path', None)
+
+
+class CacheAccessLog:
+    """Запоминает время обращения к ответам кеша за запуск (хук ответа
+    сессии) и сохраняет его в таблицу access того же файла SQLite."""
+
+    def __init__(self, session):
+        self.session = session
+        self.accessed = {}
+        self.lock = threading.Lock()
+
+    def hook(self, response, *args, **kwargs):
+        key = getattr(response, 'cache_key', None) or (
+            self.session.cache.create_key(response.request)
+        )
+        with self.lock:
+            self.accessed[key] = time.time()
+        return response
+
+    def flush(self, connection):
+        with self.lock:
+            accessed, self.accessed = self.accessed, {}
+        connection.executemany(TOUCH, accessed.items())
+
+
+def evict(connection, max_size):
+    """Удаляет давно не использованные ответы и перенаправления на них,
+    пока суммарный размер ответов больше max_size байт.
+    Возвращает (удалено ответов, освобождено байт)."""
+    rows = connection.execute(LRU_ORDER).fetchall()
+    excess = sum(size or 0 for _, size in rows) - max_size
+    victims = []
+    freed = 0
+    for key, size in rows:
+        if freed >= excess:
+            break
+        victims.append((key,))
+        freed += size or 0
+    connection.executemany('DELETE FROM responses WHERE key = ?', victims)
+    connection.executemany('DELETE FROM redirects WHERE value = ?', victims)
+    connection.executemany('DELETE FROM access WHERE key = ?', victims)
+    return len(victims), freed
+
+
+def limit_cache(session, max_size):
+    """Сохраняет время обращений и ограничивает размер кеша (LRU).
+    max_size - байты, 0 - без ограничения."""
+    db_path = cache_db_path(session)
+    if db_path is None:
+        return 0, 0
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        with connection:
+            connection.execute(ACCESS_SCHEMA)
+            access_log = getattr(session, 'access_log', None)
+            if access_log is not None:
+                access_log.flush(connection)
+            if not max_size:
+                return 0, 0
+            return evict(connection, max_size)
+    finally:
+        connection.close()
+
+
+def compact_cache(session, max_size):
+    """Ограничивает размер кеша и сжимает файл (VACUUM).
+    Возвращает (удалено ответов, размер файла до, размер файла после)."""
+    db_path = cache_db_path(session)
+    if db_path is None:
+        return 0, 0, 0
+    before = os.path.getsize(db_path)
+    evicted, _ = limit_cache(session, max_size)
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        connection.execute('VACUUM')
+    finally:
+        connection.close()
+    return evicted, before, os.path.getsize(db_path)
@@ -0,0 +1,60 @@
+import logging
+
+from constants import FLUSH_ROWS, INFO_CHECKPOINT_SAVED, INFO_RESUME
+from utils import read_json, write_json
+
+
+class Checkpoint:
+    """Контрольная точка долгого обхода: записи {ссылка: запись} уже
+    обработанных страниц. Атомарно сохраняется каждые FLUSH_ROWS записей
+    и при любом аварийном завершении (исключение, Ctrl+C, закрытый
+    генератор), после успешного обхода удаляется. С resume=True обход
+    продолжается с сохраненной точки, иначе начинается заново."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = read_json(path).get('done', {}) if resume else {}
+        self.unsaved = 0
+        if self.done:
+            logging.info(INFO_RESUME.format(path, len(self.done)))
+
+    def add(self, url, record):
+        self.done[url] = record
+        self.unsaved += 1
+        if self.unsaved >= FLUSH_ROWS:
+            self.save()
+
+    def save(self):
+        write_json(self.path, {'done': self.done})
+        self.unsaved = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            return False
+        self.save()
+        logging.info(INFO_CHECKPOINT_SAVED.format(self.path, len(self.done)))
+        return False
+
+
+def resume_pages(checkpoint, urls, fetch):
+    """Кортежи (ссылка, запись, ошибка) по urls в исходном порядке:
+    обработанные ссылки берутся из контрольной точки, остальные
+    загружаются функцией fetch(ссылки), и успешные записи заносятся
+    в точку."""
+    resumed = {url for url in urls if url in checkpoint.done}
+    fresh = iter(fetch([url for url in urls if url not in resumed]))
+    for url in urls:
+        if url in resumed:
+            yield url, checkpoint.done[url], None
+            continue
+        url, record, error = next(fresh)
+        if error is None:
+            checkpoint.add(url, record)
+        yield url, record, error
@@ -1,13 +1,46 @@
 import argparse
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from datetime import timedelta
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from queue import Full, Queue
 
-from constants import LOG_DIR, LOG_FILE, PARSER_FILE, PARSER_PRETTY
+from constants import (BACKOFF_FACTOR, CACHE_EXPIRE_AFTER, CACHE_MAX_RESPONSE,
+                       CACHE_MAX_SIZE, CACHE_NAME, CACHE_URLS_EXPIRE_AFTER,
+                       CONNECT_TIMEOUT, DOWNLOAD_FORMAT_ALL, DOWNLOAD_FORMATS,
+                       DOWNLOAD_SEGMENTS, ENGINE_ASYNC, ENGINE_SYNC,
+                       INFO_EXPIRE_RULE, INFO_LOG_DROPPED, INFO_SHARD_RULE,
+                       LOG_DIR, LOG_FILE, LOG_QUEUE_SIZE, MEGABYTE, PARSE_FULL,
+                       PARSE_PARTIAL, PARSE_XPATH, PARSER_FILE, PARSER_PRETTY,
+                       PARSER_SQLITE, POOL_SIZE, PROCESSES,
+                       PROFILE_DETERMINISTIC, PROFILE_SAMPLING, PROFILE_TOP,
+                       RATE_BURST, RATE_LIMIT, RATE_LIMIT_MAX, READ_TIMEOUT,
+                       RETRIES, SEARCH_LIMIT, WATCH_INTERVAL, WATCH_POLLS,
+                       WORKERS)
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
 
 
+def expire_rule(value):
+    """Разбирает правило устаревания кеша вида ШАБЛОН=СЕКУНДЫ."""
+    pattern, _, seconds = value.rpartition('=')
+    if not pattern or not seconds.isdigit():
+        raise argparse.ArgumentTypeError(INFO_EXPIRE_RULE.format(value))
+    return pattern, timedelta(seconds=int(seconds))
+
+
+def shard_rule(value):
+    """Разбирает номер шарда вида i/N (1 <= i <= N)."""
+    index, _, total = value.partition('/')
+    if not (index.isdigit() and total.isdigit()
+            and 1 <= int(index) <= int(total)):
+        raise argparse.ArgumentTypeError(INFO_SHARD_RULE.format(value))
+    return int(index), int(total)
+
+
 def configure_argument_parser(available_modes):
     """Конфигурирует работу парсера через аргументы командной строки."""
     parser = argparse.ArgumentParser(description='Парсер документации Python')
@@ -16,6 +49,12 @@ def configure_argument_parser(available_modes):
         choices=available_modes,
         help='Режимы работы парсера'
     )
+    parser.add_argument(
+        'params',
+        nargs='*',
+        help='Параметры команды, например: cache compact, watch pep, '
+             'search asyncio'
+    )
     parser.add_argument(
         '-c',
         '--clear-cache',
@@ -25,24 +64,295 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PARSER_PRETTY, PARSER_FILE),
+        choices=(PARSER_PRETTY, PARSER_FILE, PARSER_SQLITE),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=WORKERS,
+        help='Количество потоков загрузки страниц '
+             '(для движка async - одновременных запросов)'
+    )
+    parser.add_argument(
+        '-e',
+        '--engine',
+        choices=(ENGINE_SYNC, ENGINE_ASYNC),
+        default=ENGINE_SYNC,
+        help='Движок загрузки страниц'
+    )
+    parser.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=PROCESSES,
+        help='Количество процессов разбора страниц (0 - без пула процессов)'
+    )
+    parser.add_argument(
+        '--parse',
+        choices=(PARSE_FULL, PARSE_PARTIAL, PARSE_XPATH),
+        default=PARSE_PARTIAL,
+        help='Разбор страниц: целиком, только нужной части или через XPath'
+    )
+    parser.add_argument(
+        '--expire',
+        type=expire_rule,
+        action='append',
+        default=[],
+        metavar='ШАБЛОН=СЕКУНДЫ',
+        help='Срок годности страниц кеша для шаблона адреса '
+             '(раньше правил по умолчанию)'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только изменившиеся с прошлого запуска карточки PEP'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить прерванный запуск pep или whats-new '
+             'с контрольной точки, не загружая обработанные страницы'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard_rule,
+        metavar='i/N',
+        help='Загружать только i-ю из N частей индекса PEP (по номеру PEP) '
+             'и сохранить частичный результат для команды merge'
+    )
+    parser.add_argument(
+        '--metrics',
+        type=Path,
+        metavar='ФАЙЛ',
+        help='Сохранить метрики этапов запуска: *.prom - в текстовом '
+             'формате Prometheus, иначе в JSON'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=PROFILE_DETERMINISTIC,
+        choices=(PROFILE_DETERMINISTIC, PROFILE_SAMPLING),
+        help='Профилировать запуск: pstats, стеки для flamegraph и топ '
+             'функций сохраняются в каталог логов'
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=PROFILE_TOP,
+        help='Сколько самых затратных функций выводить в отчет профиля'
+    )
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument(
+        '--record',
+        type=Path,
+        metavar='КАТАЛОГ',
+        help='Записывать все полученные ответы в снимок'
+    )
+    snapshot.add_argument(
+        '--replay',
+        type=Path,
+        metavar='КАТАЛОГ',
+        help='Отвечать на запросы из снимка, не обращаясь к сети'
+    )
+    cache = parser.add_argument_group('Кеш')
+    cache.add_argument(
+        '--cache-max-size',
+        type=float,
+        default=CACHE_MAX_SIZE,
+        help='Предельный размер кеша, МБ: после запуска вытесняются '
+             'давно не использованные ответы (0 - без ограничения)'
+    )
+    cache.add_argument(
+        '--cache-max-response',
+        type=float,
+        default=CACHE_MAX_RESPONSE,
+        help='Не кешировать двоичные ответы больше этого размера, МБ '
+             '(0 - кешировать все)'
+    )
+    download = parser.add_argument_group('Загрузка (download)')
+    download.add_argument(
+        '--formats',
+        nargs='+',
+        choices=(*DOWNLOAD_FORMATS, DOWNLOAD_FORMAT_ALL),
+        metavar='ФОРМАТ',
+        help='Форматы архивов документации: '
+             f'{", ".join(DOWNLOAD_FORMATS)} или {DOWNLOAD_FORMAT_ALL} '
+             f'(по умолчанию {DOWNLOAD_FORMATS[0]})'
+    )
+    download.add_argument(
+        '--segments',
+        type=int,
+        default=DOWNLOAD_SEGMENTS,
+        help='На сколько частей по Range делить загрузку больших архивов '
+             '(1 - загружать одним потоком)'
+    )
+    search = parser.add_argument_group('Поиск (search)')
+    search.add_argument(
+        '--limit',
+        type=int,
+        default=SEARCH_LIMIT,
+        help='Сколько найденных документов выводить'
+    )
+    watch = parser.add_argument_group('Наблюдение (watch)')
+    watch.add_argument(
+        '--interval',
+        type=float,
+        default=WATCH_INTERVAL,
+        help='Интервал между опросами страниц, секунды'
+    )
+    watch.add_argument(
+        '--polls',
+        type=int,
+        default=WATCH_POLLS,
+        help='Сколько опросов выполнить (0 - до остановки по Ctrl+C)'
+    )
+    watch.add_argument(
+        '--events',
+        type=Path,
+        metavar='ФАЙЛ',
+        help='Дописывать события изменений в файл JSONL (кроме stdout)'
+    )
+    transport = parser.add_argument_group('Транспорт')
+    transport.add_argument(
+        '--pool-size',
+        type=int,
+        default=POOL_SIZE,
+        help='Размер пула соединений к одному хосту'
+    )
+    transport.add_argument(
+        '--no-keep-alive',
+        action='store_true',
+        help='Закрывать соединение после каждого запроса'
+    )
+    transport.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=CONNECT_TIMEOUT,
+        help='Таймаут установки соединения, с'
+    )
+    transport.add_argument(
+        '--read-timeout',
+        type=float,
+        default=READ_TIMEOUT,
+        help='Таймаут чтения ответа, с'
+    )
+    transport.add_argument(
+        '--retries',
+        type=int,
+        default=RETRIES,
+        help='Количество повторов при ошибках соединения и ответах 5xx'
+    )
+    transport.add_argument(
+        '--backoff',
+        type=float,
+        default=BACKOFF_FACTOR,
+        help='Множитель экспоненциальной задержки между повторами, с'
+    )
+    transport.add_argument(
+        '--rate',
+        type=float,
+        default=RATE_LIMIT,
+        help='Начальный темп запросов к одному хосту, запросов в секунду '
+             '(0 - без ограничения)'
+    )
+    transport.add_argument(
+        '--burst',
+        type=int,
+        default=RATE_BURST,
+        help='Сколько запросов к хосту можно отправить подряд без ожидания'
+    )
+    transport.add_argument(
+        '--max-rate',
+        type=float,
+        default=RATE_LIMIT_MAX,
+        help='Предельный темп запросов к одному хосту, запросов в секунду'
+    )
     return parser
 
 
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler, который не блокирует поток при переполненной очереди:
+    лишние записи отбрасываются и считаются."""
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+
 def configure_logging():
-    """Конфигурирует логгирование в парсере"""
+    """Конфигурирует логгирование в парсере. Потоки загрузки и разбора
+    только кладут записи в ограниченную очередь, а в файл и терминал их
+    пишет отдельный поток QueueListener. Возвращает запущенный listener;
+    он останавливается при выходе, дописав очередь."""
     LOG_DIR.mkdir(exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT, DT_FORMAT)
     rotating_handler = RotatingFileHandler(
         LOG_FILE, maxBytes=10 ** 6, backupCount=5
     )
-    logging.basicConfig(
-        datefmt=DT_FORMAT,
-        format=LOG_FORMAT,
-        level=logging.INFO,
-        handlers=(
-            rotating_handler,
-            logging.StreamHandler()
-        )
+    stream_handler = logging.StreamHandler()
+    for handler in (rotating_handler, stream_handler):
+        handler.setFormatter(formatter)
+    queue_handler = DroppingQueueHandler(Queue(LOG_QUEUE_SIZE))
+    # Оформление записи - дело обработчиков listener, в очередь идет текст.
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=(queue_handler,))
+    listener = QueueListener(
+        queue_handler.queue, rotating_handler, stream_handler
+    )
+    listener.start()
+
+    def stop():
+        listener.stop()
+        if queue_handler.dropped:
+            stream_handler.handle(logging.makeLogRecord({
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': INFO_LOG_DROPPED.format(queue_handler.dropped),
+            }))
+
+    atexit.register(stop)
+    return listener
+
+
+def configure_session(cli_args=None):
+    """Создает сессию с кешем и настроенным транспортом: у каждого шаблона
+    адреса свой срок годности, устаревшие страницы перепроверяются
+    по ETag/Last-Modified, большие двоичные ответы не кешируются, время
+    обращения к ответам запоминается для вытеснения (LRU). Может записывать
+    ответы в снимок или отвечать из снимка."""
+    import requests_cache
+
+    from cache_utils import CacheAccessLog, cacheable
+    from snapshots import mount_snapshots
+    from transport import mount_transport
+
+    urls_expire_after = dict(getattr(cli_args, 'expire', None) or ())
+    for pattern, expire_after in CACHE_URLS_EXPIRE_AFTER.items():
+        urls_expire_after.setdefault(pattern, expire_after)
+    session = mount_transport(
+        requests_cache.CachedSession(
+            CACHE_NAME,
+            expire_after=CACHE_EXPIRE_AFTER,
+            urls_expire_after=urls_expire_after,
+            stale_if_error=True,
+            filter_fn=partial(
+                cacheable,
+                max_response=getattr(
+                    cli_args, 'cache_max_response', CACHE_MAX_RESPONSE
+                ) * MEGABYTE
+            ),
+        ),
+        cli_args
     )
+    session.access_log = CacheAccessLog(session)
+    session.hooks['response'].append(session.access_log.hook)
+    return mount_snapshots(session, cli_args)
@@ -1,13 +1,94 @@
+from datetime import timedelta
 from pathlib import Path
 
+# Режимы команды all по умолчанию.
+ALL_MODES = ('whats-new', 'latest-versions', 'pep')
+BACKEND_LXML = 'lxml'
+BACKEND_SOUP = 'soup'
+BACKOFF_FACTOR = 0.5
 BASE_DIR = Path(__file__).parent
+BATCH_ROWS = 500
+CACHE_NAME = 'http_cache'
+CACHE_EXPIRE_AFTER = timedelta(days=1)
+CACHE_MAX_RESPONSE = 5
+CACHE_MAX_SIZE = 200
+# Срок годности страниц в кеше по шаблонам адресов: срабатывает первый
+# подходящий шаблон, поэтому частные правила идут раньше общих.
+CACHE_URLS_EXPIRE_AFTER = {
+    'peps.python.org/pep-': timedelta(days=7),
+    'docs.python.org/3/whatsnew/3.': timedelta(days=7),
+    'peps.python.org': timedelta(hours=1),
+    'docs.python.org': timedelta(hours=1),
+}
+CHECKPOINT_FILE = 'checkpoint_{}.json'
+CHUNK_SIZE = 2 ** 16
+COMMAND_CACHE_COMPACT = 'compact'
+CONNECT_TIMEOUT = 5
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 DOWNLOAD_DIR = 'downloads'
+DOWNLOAD_FORMAT_ALL = 'all'
+# Форматы архивов на странице загрузки документации (окончание имени файла).
+DOWNLOAD_FORMATS = (
+    'pdf-a4.zip', 'pdf-a4.tar.bz2', 'pdf-letter.zip', 'pdf-letter.tar.bz2',
+    'html.zip', 'html.tar.bz2', 'text.zip', 'text.tar.bz2',
+    'texinfo.zip', 'texinfo.tar.bz2', 'epub',
+)
+DOWNLOAD_MANIFEST = 'manifest.json'
+DOWNLOAD_SEGMENTS = 4
+ENGINE_ASYNC = 'async'
+ENGINE_SYNC = 'sync'
+FLUSH_ROWS = 100
+INDEX_EXTENSIONS = ('.txt', '.html', '.htm')
+INDEX_FORMATS = ('html.zip', 'html.tar.bz2', 'text.zip', 'text.tar.bz2')
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
+LOG_QUEUE_SIZE = 10000
+MEGABYTE = 2 ** 20
+PARSE_FULL = 'full'
+PARSE_PARTIAL = 'partial'
+PARSE_XPATH = 'xpath'
+# Движок разбора для каждого значения --parse.
+PARSE_TO_BACKEND = {
+    PARSE_FULL: BACKEND_SOUP,
+    PARSE_PARTIAL: BACKEND_SOUP,
+    PARSE_XPATH: BACKEND_LXML,
+}
 PARSER_FILE = 'file'
 PARSER_PRETTY = 'pretty'
+PARSER_SQLITE = 'sqlite'
+PEP_SHARD_FILE = 'pep_shard_{}_of_{}.json'
+PEP_SHARD_GLOB = 'pep_shard_*_of_*.json'
+PEP_SHARD_STATE_FILE = 'pep_{}_of_{}.json'
+PEP_STATE_FILE = 'pep.json'
+POOL_SIZE = 10
+PROFILE_DETERMINISTIC = 'cprofile'
+PROFILE_INTERVAL = 0.005
+PROFILE_SAMPLING = 'sampling'
+PROFILE_TOP = 30
+PROCESSES = 0
+RATE_BURST = 10
+RATE_DECREASE = 0.5
+RATE_INCREASE = 0.5
+RATE_LIMIT = 10
+RATE_LIMIT_MAX = 50
+RATE_LIMIT_MIN = 0.5
+READ_TIMEOUT = 30
+RESULTS_DB = 'results.sqlite3'
 RESULTS_DIR = 'results'
+RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+SEARCH_DB = 'search.sqlite3'
+SEARCH_LIMIT = 20
+SEGMENT_MIN_SIZE = 8 * MEGABYTE
+SNAPSHOT_INDEX_FILE = 'index.jsonl'
+SNAPSHOT_PACK_FILE = 'snapshot.pack'
+STAGE_FETCH = 'fetch'
+STATE_DIR = 'state'
+THROTTLE_STATUSES = RETRY_STATUSES
+WATCH_INTERVAL = 300
+WATCH_POLLS = 0
+WATCH_STATE_FILE = 'watch.json'
+WORKERS = 1
 
 INFO_ALL_VERSHIONS_NOT_FOUND = '"All versions" не найдены.'
 INFO_ARGS = 'Аргументы командной строки {}'
@@ -17,12 +98,52 @@ INFO_DIFFERENT_STATUS = (
     'Ожидаемые статусы: {}'
 )
 INFO_DOWNLOAD = 'Архив был загружен и сохранён {}'
+INFO_DOWNLOAD_FORMATS = 'На странице загрузки нет архивов форматов: {}'
+INFO_DOWNLOAD_SKIPPED = 'Архив не изменился, загрузка пропущена {}'
 INFO_FINISH = 'Парсер завершил работу.'
+INFO_INCREMENTAL = 'Изменились строки индекса PEP: {} из {}'
 INFO_URL_UNAVAILABLE = 'Страница {} не доступна {}'
 INFO_SAVE = 'Файл с результатами был сохранён {}'
+INFO_SAVE_DB = 'В базу {} записано строк: {} (запуск {})'
+INFO_SHARD_RULE = 'Шард должен иметь вид i/N, где 1 <= i <= N: {}'
+INFO_SHARD_SAVED = 'Частичный результат шарда {}/{} сохранён {}'
+INFO_SHARDS_INVALID = (
+    'Для объединения нужны результаты всех шардов 1..N одного '
+    'разбиения, получены: {}'
+)
+INFO_RANGE_IGNORED = 'Сервер не вернул запрошенную часть файла {}'
+INFO_INDEXED = (
+    'Архив {} проиндексирован: добавлено или обновлено документов {}, '
+    'без изменений {}, удалено {}'
+)
+INFO_INDEX_EMPTY = 'Нет архивов HTML или текста для индексации в {}'
+INFO_INDEX_SKIPPED = 'Архив {} не изменился с прошлой индексации'
+INFO_SEARCH = 'Найдено документов: {} за {:.1f} мс'
+INFO_SEARCH_EMPTY = 'Укажите слова для поиска: search СЛОВО ...'
 INFO_START = 'Парсер запущен.'
 INFO_TAG_ERROR = 'Не найден тег {} {}'
 INFO_ERROR = 'Ошибка {}'
+INFO_METRICS = 'Этапы запуска:\n{}'
+INFO_METRICS_SAVED = 'Метрики сохранены {}'
+INFO_PROFILE = (
+    'Профиль сохранён {}.pstats/.collapsed/.txt (топ-{} функций)'
+)
+INFO_CHECKPOINT_SAVED = 'Контрольная точка сохранена {}: обработано страниц {}'
+INFO_RESUME = 'Продолжение с контрольной точки {}: обработано страниц {}'
+INFO_CACHE_COMPACT = (
+    'Кеш {} сжат: удалено ответов {}, размер {:.1f} -> {:.1f} МБ, '
+    'освобождено {:.1f} МБ'
+)
+INFO_CACHE_EVICTED = 'Из кеша вытеснено ответов: {} ({:.1f} МБ)'
+INFO_COMMAND_PARAMS = 'Неизвестные параметры команды {}: {}'
+INFO_LOG_DROPPED = 'Очередь логов была переполнена, потеряно записей: {}'
+INFO_MODE_ERROR = 'Режим {} завершился с ошибкой: {}'
+INFO_MODE_PARAMS = 'Режим {} не принимает параметров: {}'
+INFO_NOT_IN_SNAPSHOT = 'Нет в снимке'
+INFO_WATCH_BASELINE = 'Наблюдение за {}: исходное состояние, записей {}'
+INFO_WATCH_CHANGES = 'Наблюдение за {}: изменений {}'
+INFO_WATCH_STOPPED = 'Наблюдение остановлено, опросов: {}'
+INFO_EXPIRE_RULE = 'Правило должно иметь вид ШАБЛОН=СЕКУНДЫ: {}'
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEPS_URL = 'https://peps.python.org/'
@@ -37,3 +158,11 @@ EXPECTED_STATUS = {
     'W': ('Withdrawn',),
     '': ('Draft', 'Active'),
 }
+
+# Колонка с естественным ключом строки результата для --output sqlite.
+MODE_TO_KEY_COLUMN = {
+    'whats-new': 0,
+    'latest-versions': 1,
+    'pep': 0,
+    'search': 1,
+}
@@ -0,0 +1,216 @@
+import datetime as dt
+import hashlib
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from requests import RequestException
+
+from constants import (CHUNK_SIZE, DOWNLOAD_MANIFEST, DOWNLOAD_SEGMENTS,
+                       INFO_RANGE_IGNORED, INFO_URL_UNAVAILABLE, POOL_SIZE,
+                       SEGMENT_MIN_SIZE)
+from utils import read_json, write_json
+
+NO_STORE = {'Cache-Control': 'no-store'}
+VALIDATORS = ('ETag', 'Last-Modified')
+
+
+def get_remote_info(session, url):
+    """Запрашивает сведения об удаленном файле без загрузки тела:
+    (ETag и Last-Modified, размер или None, принимает ли сервер Range)."""
+    response = session.head(url, allow_redirects=True, headers=NO_STORE)
+    if not response.ok:
+        return {}, None, False
+    size = response.headers.get('Content-Length')
+    return (
+        {
+            key: response.headers[key]
+            for key in VALIDATORS if key in response.headers
+        },
+        int(size) if size and size.isdigit() else None,
+        response.headers.get('Accept-Ranges') == 'bytes'
+    )
+
+
+def get_validators(session, url):
+    """Запрашивает ETag и Last-Modified удаленного файла без загрузки тела."""
+    return get_remote_info(session, url)[0]
+
+
+def archive_format(url):
+    """Формат архива по имени файла: python-3.12-docs-pdf-a4.zip -
+    pdf-a4.zip, python-3.12-docs.epub - epub."""
+    return url.rsplit('/', 1)[-1].partition('-docs')[2].lstrip('-.')
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    """Контрольная сумма SHA-256 файла."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stream_download(session, url, path, chunk_size=CHUNK_SIZE,
+                    validators=None):
+    """Потоково загружает файл по частям, минуя кеш (Cache-Control: no-store).
+    Докачивает прерванную загрузку через Range, если ETag/Last-Modified
+    не изменились. validators - уже известные ETag/Last-Modified файла;
+    без них они запрашиваются HEAD-запросом. Решение, нужна ли загрузка,
+    принимает вызывающий (манифест в fetch_archive)."""
+    meta_path = path.with_name(path.name + '.meta.json')
+    part_path = path.with_name(path.name + '.part')
+    meta = read_json(meta_path)
+    try:
+        if validators is None:
+            validators = get_validators(session, url)
+        offset = 0
+        if validators and meta.get('validators') == validators and (
+            part_path.exists()
+        ):
+            offset = part_path.stat().st_size
+        headers = dict(NO_STORE)
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = (
+                validators.get('ETag') or validators['Last-Modified']
+            )
+        write_json(meta_path, {'validators': validators})
+        with session.get(url, headers=headers, stream=True) as response:
+            if not (offset and part_complete(response, offset)):
+                response.raise_for_status()
+                mode = 'ab' if response.status_code == 206 else 'wb'
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size):
+                        file.write(chunk)
+    except RequestException as error:
+        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url, error))
+    os.replace(part_path, path)
+    meta_path.unlink()
+
+
+def part_complete(response, offset):
+    """Загружен ли .part размера offset целиком: на Range с его конца
+    сервер отвечает 416 с полным размером файла в Content-Range
+    (bytes */размер). ETag/Last-Modified .part уже сверены с сервером."""
+    if response.status_code != 416:
+        return False
+    total = response.headers.get('Content-Range', '').rpartition('/')[2]
+    return total.isdigit() and int(total) == offset
+
+
+def segment_download(session, url, path, size, validators,
+                     segments=DOWNLOAD_SEGMENTS, chunk_size=CHUNK_SIZE,
+                     executor=None):
+    """Загружает файл размера size параллельно segments частями по Range
+    (с If-Range, чтобы не склеить части разных версий файла) в заранее
+    выделенный файл и переносит его на место path после всех частей.
+    Части загружаются в пуле executor, общем для всех архивов, чтобы число
+    одновременных соединений не превышало его размер; без него - в своем
+    пуле из segments потоков."""
+    part_path = path.with_name(path.name + '.part')
+    step = math.ceil(size / segments)
+    ranges = [
+        (start, min(start + step, size) - 1)
+        for start in range(0, size, step)
+    ]
+    with open(part_path, 'wb') as file:
+        file.truncate(size)
+
+    def fetch(byte_range):
+        start, end = byte_range
+        headers = {**NO_STORE, 'Range': f'bytes={start}-{end}'}
+        if validators:
+            headers['If-Range'] = (
+                validators.get('ETag') or validators['Last-Modified']
+            )
+        with session.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise ConnectionError(INFO_RANGE_IGNORED.format(url))
+            with open(part_path, 'r+b') as file:
+                file.seek(start)
+                for chunk in response.iter_content(chunk_size):
+                    file.write(chunk)
+                if file.tell() != end + 1:
+                    raise ConnectionError(INFO_RANGE_IGNORED.format(url))
+
+    try:
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as own:
+                list(own.map(fetch, ranges))
+        else:
+            list(executor.map(fetch, ranges))
+    except RequestException as error:
+        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url, error))
+    os.replace(part_path, path)
+
+
+def fetch_archive(session, url, path, entry, segments=DOWNLOAD_SEGMENTS,
+                  executor=None):
+    """Загружает архив, если он изменился с прошлой загрузки: совпадение
+    ETag/Last-Modified с записью манифеста entry проверяется вместе
+    с контрольной суммой файла на диске. Большие файлы на серверах
+    с поддержкой Range загружаются частями параллельно, остальные -
+    одним потоком с докачкой. Части загружаются в пуле executor.
+    Возвращает (запись манифеста, загружен ли)."""
+    try:
+        validators, size, ranges = get_remote_info(session, url)
+    except RequestException as error:
+        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url, error))
+    if (
+        validators and entry and entry['validators'] == validators
+        and path.exists() and file_sha256(path) == entry['sha256']
+    ):
+        return entry, False
+    if ranges and size and segments > 1 and size >= SEGMENT_MIN_SIZE:
+        segment_download(
+            session, url, path, size, validators, segments,
+            executor=executor
+        )
+    else:
+        stream_download(session, url, path, validators=validators)
+    return {
+        'url': url,
+        'size': path.stat().st_size,
+        'sha256': file_sha256(path),
+        'validators': validators,
+        'downloaded_at': dt.datetime.now().isoformat(timespec='seconds'),
+    }, True
+
+
+def download_archives(session, urls, directory, workers=1,
+                      segments=DOWNLOAD_SEGMENTS, pool_size=POOL_SIZE):
+    """Загружает архивы urls в directory параллельно в workers потоков.
+    Части больших архивов загружаются в общем пуле из pool_size потоков,
+    так что одновременных соединений не больше, чем в пуле сессии.
+    Манифест directory/manifest.json (размер, SHA-256, ETag/Last-Modified
+    каждого файла) обновляется после каждого архива. Генератор кортежей
+    (ссылка, путь, загружен ли, ошибка) по мере готовности."""
+    manifest_path = directory / DOWNLOAD_MANIFEST
+    manifest = read_json(manifest_path)
+    lock = threading.Lock()
+
+    def fetch(url):
+        filename = url.rsplit('/', 1)[-1]
+        path = directory / filename
+        try:
+            entry, downloaded = fetch_archive(
+                session, url, path, manifest.get(filename), segments,
+                segment_pool
+            )
+        except ConnectionError as error:
+            return url, path, False, error
+        with lock:
+            manifest[filename] = entry
+            write_json(manifest_path, manifest)
+        return url, path, downloaded, None
+
+    with ThreadPoolExecutor(
+        max_workers=max(min(workers, pool_size), 1)
+    ) as executor, ThreadPoolExecutor(
+        max_workers=max(pool_size, 1)
+    ) as segment_pool:
+        yield from executor.map(fetch, urls)
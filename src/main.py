@@ -14,6 +14,15 @@
 # Запуск парсера, который скачивает архив документации Python.
 (venv) ...$ python main.py download
 
+# Загрузка архивов документации нескольких форматов (частями по Range).
+(venv) ...$ python main.py download --formats html.zip text.tar.bz2 epub
+(venv) ...$ python main.py download --formats all --segments 8
+
+# Полнотекстовый индекс по загруженным архивам и поиск по нему.
+(venv) ...$ python main.py download --formats text.zip
+(venv) ...$ python main.py index
+(venv) ...$ python main.py search asyncio TaskGroup --limit 5
+
 # Запуск парсера - сохранение результатов в файл.
 (venv) ...$ python main.py whats-new --output file
 (venv) ...$ python main.py latest-versions --output file
@@ -24,140 +33,558 @@
 (venv) ...$ python main.py latest-versions --output pretty
 (venv) ...$ python main.py pep --output pretty
 
+# Запуск парсера - сохранение результатов в базу SQLite с историей запусков.
+(venv) ...$ python main.py pep --output sqlite
+
 # Очистка кэша.
 (venv) ...$ python main.py whats-new -c
 (venv) ...$ python main.py pep -c
+
+# Запуск парсера подсчета PEP Python в 8 потоков.
+(venv) ...$ python main.py pep --workers 8
+
+# Запуск парсера на асинхронном движке (до 100 запросов одновременно).
+(venv) ...$ python main.py pep --engine async --workers 100
+
+# Запуск парсера с разбором страниц в 4 процессах.
+(venv) ...$ python main.py pep --workers 16 --processes 4
+
+# Запуск парсера со своим сроком годности кеша для карточек PEP (1 час).
+(venv) ...$ python main.py pep --expire peps.python.org/pep-=3600
+
+# Запуск парсера PEP только по изменившимся с прошлого запуска строкам индекса.
+(venv) ...$ python main.py pep --incremental
+
+# Настройка транспорта: пул соединений, таймауты, повторы с задержкой.
+(venv) ...$ python main.py pep -w 16 --pool-size 16 --read-timeout 10 \
+    --retries 5 --backoff 1
+
+# Запись ответов в снимок и воспроизведение снимка без сети.
+(venv) ...$ python main.py pep --record snapshots/2024-05
+(venv) ...$ python main.py pep --replay snapshots/2024-05
+
+# Метрики этапов (загрузка, разбор, кеш) для node exporter или в JSON.
+(venv) ...$ python main.py pep --metrics /var/lib/node_exporter/parser.prom
+(venv) ...$ python main.py pep --metrics metrics.json
+
+# Кеш не больше 100 МБ (LRU), сжатие файла кеша.
+(venv) ...$ python main.py pep --cache-max-size 100
+(venv) ...$ python main.py cache compact
+
+# Профилирование запуска (cProfile или выборка стеков всех потоков).
+(venv) ...$ python main.py pep --profile
+(venv) ...$ python main.py pep -w 16 --profile sampling --profile-top 50
+
+# Несколько режимов параллельно на одной сессии, у каждого свой вывод.
+(venv) ...$ python main.py all --output file
+(venv) ...$ python main.py all latest-versions pep -w 8
+
+# Продолжение прерванного запуска с контрольной точки.
+(venv) ...$ python main.py pep --resume
+
+# Подсчет PEP по частям на 4 узлах и объединение частичных результатов.
+(venv) ...$ python main.py pep --shard 1/4
+(venv) ...$ python main.py merge results/pep_shard_*.json --output file
+
+# Наблюдение за статусами версий и PEP: изменения выводятся в JSONL.
+(venv) ...$ python main.py watch --interval 600 --events changes.jsonl
+(venv) ...$ python main.py watch pep --polls 1
 """
+import copy
+import datetime as dt
 import logging
-import re
-from collections import defaultdict
+import threading
+import time
+from functools import partial
+from importlib import import_module
+from pathlib import Path
 from urllib.parse import urljoin
 
-import requests_cache
-from tqdm import tqdm
-
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOAD_DIR, EXPECTED_STATUS,
-                       INFO_ALL_VERSHIONS_NOT_FOUND, INFO_ARGS,
-                       INFO_DIFFERENT_STATUS, INFO_DOWNLOAD, INFO_ERROR,
-                       INFO_FINISH, INFO_START, INFO_URL_UNAVAILABLE,
-                       MAIN_DOC_URL, PEPS_URL)
-from exceptions import ParserFindKeyWordException
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session)
+from constants import (ALL_MODES, BASE_DIR, CACHE_MAX_SIZE, CHECKPOINT_FILE,
+                       COMMAND_CACHE_COMPACT, DOWNLOAD_DIR,
+                       DOWNLOAD_FORMAT_ALL, DOWNLOAD_FORMATS,
+                       DOWNLOAD_SEGMENTS, ENGINE_ASYNC, ENGINE_SYNC,
+                       EXPECTED_STATUS, FLUSH_ROWS, INDEX_FORMATS, INFO_ARGS,
+                       INFO_CACHE_COMPACT, INFO_CACHE_EVICTED,
+                       INFO_COMMAND_PARAMS, INFO_DIFFERENT_STATUS,
+                       INFO_DOWNLOAD, INFO_DOWNLOAD_FORMATS,
+                       INFO_DOWNLOAD_SKIPPED, INFO_ERROR, INFO_FINISH,
+                       INFO_INCREMENTAL, INFO_INDEX_EMPTY, INFO_INDEX_SKIPPED,
+                       INFO_INDEXED, INFO_MODE_ERROR, INFO_MODE_PARAMS,
+                       INFO_SEARCH, INFO_SEARCH_EMPTY, INFO_SHARD_SAVED,
+                       INFO_START, INFO_URL_UNAVAILABLE, MAIN_DOC_URL,
+                       MEGABYTE, PARSE_PARTIAL, PEP_SHARD_FILE, PEP_SHARD_GLOB,
+                       PEP_SHARD_STATE_FILE, PEP_STATE_FILE, PEPS_URL,
+                       POOL_SIZE, PROCESSES, RESULTS_DIR, SEARCH_DB,
+                       SEARCH_LIMIT, STATE_DIR, WORKERS)
+from metrics import report_metrics
 from outputs import control_output
-from utils import find_tag, get_soup
 
+# Тяжелые зависимости (bs4, lxml, requests_cache, aiohttp, tqdm)
+# импортируются внутри режимов, которым они нужны: справка (-h) и запуски
+# из кеша не тратят время на загрузку лишних модулей.
+ENGINE_TO_PAGES = {
+    ENGINE_SYNC: 'utils.get_pages',
+    ENGINE_ASYNC: 'async_utils.get_pages_async',
+}
+
+
+def get_pages_engine(cli_args=None):
+    """Функция загрузки страниц движка --engine (импортируется по запросу).
+    """
+    module, _, name = ENGINE_TO_PAGES[
+        getattr(cli_args, 'engine', ENGINE_SYNC)
+    ].rpartition('.')
+    return getattr(import_module(module), name)
 
-def whats_new(session):
+
+def with_parse(extractor, cli_args=None):
+    """Функция разбора страниц с движком, выбранным в --parse."""
+    return partial(extractor, parse=getattr(cli_args, 'parse', PARSE_PARTIAL))
+
+
+def checkpoint_path(name):
+    """Файл контрольной точки обхода name в каталоге состояния."""
+    return BASE_DIR / STATE_DIR / CHECKPOINT_FILE.format(name)
+
+
+def whats_new(session, cli_args=None):
     """Собирает ссылки на статьи об изменениях между основными версиями Python
-     и достанете из них справочную информацию: имя автора (редактора) статьи"""
+     и достанете из них справочную информацию: имя автора (редактора) статьи.
+     Генератор: строки отдаются по мере загрузки статей.
+     С --resume продолжает прерванный запуск с контрольной точки."""
+    from tqdm import tqdm
+
+    from checkpoints import Checkpoint, resume_pages
+    from parsers import extract_whats_new, extract_whats_new_links
+    from utils import extract_page, extract_pages
+
+    def fetch(urls):
+        return extract_pages(
+            with_parse(extract_whats_new, cli_args),
+            get_pages_engine(cli_args)(
+                session, urls, workers=getattr(cli_args, 'workers', WORKERS)
+            ),
+            processes=getattr(cli_args, 'processes', PROCESSES)
+        )
+
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    reference_internal = get_soup(session, whats_new_url).select(
-        '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 >a'
+    links = extract_page(
+        session, whats_new_url, with_parse(extract_whats_new_links, cli_args)
     )
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-    messages = []
-    for reference in tqdm(reference_internal, desc='reference_internal'):
-        href = reference['href']
-        version_link = urljoin(whats_new_url, href)
-        try:
-            soup = get_soup(session, version_link)
-        except ConnectionError as error:
-            messages.append(INFO_URL_UNAVAILABLE.format(version_link, error))
-            continue
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        results.append(
-            (version_link, h1.text.encode("utf-8"), dl.text.encode("utf-8"))
-        )
-    for log in messages:
-        logging.info(log)
-    return results
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+    with Checkpoint(
+        checkpoint_path('whats-new'), getattr(cli_args, 'resume', False)
+    ) as checkpoint:
+        for version_link, fields, error in tqdm(
+            resume_pages(
+                checkpoint, [urljoin(whats_new_url, link) for link in links],
+                fetch
+            ),
+            total=len(links),
+            desc='reference_internal'
+        ):
+            if error is not None:
+                logging.info(INFO_URL_UNAVAILABLE.format(version_link, error))
+                continue
+            h1, dl = fields
+            yield version_link, h1.encode("utf-8"), dl.encode("utf-8")
+
 
+def latest_versions(session, cli_args=None):
+    """Собирает ссылки на документацию различных версий Python и их статус.
+    Генератор: строки отдаются по мере разбора."""
+    from parsers import extract_latest_versions, version_status
+    from utils import extract_page
 
-def latest_versions(session):
-    """Собирает ссылки на документацию различных версий Python и их статус."""
-    ul_tags = get_soup(session, MAIN_DOC_URL).select(
-        'div.sphinxsidebarwrapper ul'
+    a_tags = extract_page(
+        session, MAIN_DOC_URL, with_parse(extract_latest_versions, cli_args)
     )
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise ParserFindKeyWordException(INFO_ALL_VERSHIONS_NOT_FOUND)
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        if re.search(pattern, a_tag.text):
-            version = re.search(pattern, a_tag.text).group(1)
-            status = re.search(pattern, a_tag.text).group(2)
-        else:
-            version, status = a_tag.text, ''
-        results.append(
-            (a_tag['href'], version, status)
-        )
-    return results
+    yield 'Ссылка на документацию', 'Версия', 'Статус'
+    for href, text in a_tags:
+        yield (href, *version_status(text))
+
 
+def download(session, cli_args=None):
+    """Загружает архивы документации к Python форматов --formats
+    (по умолчанию PDF A4) параллельно; большие архивы - частями по Range.
+    Неизменившиеся архивы (по манифесту с ETag и SHA-256) пропускаются."""
+    from download_utils import archive_format, download_archives
+    from parsers import extract_download_links
+    from utils import extract_page
 
-def download(session):
-    """Загружает документацию к Python."""
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    soup = get_soup(session, downloads_url)
-    archive_url = urljoin(
-        downloads_url,
-        soup.select_one('table.docutils a[href$="pdf-a4.zip"]')['href']
+    links = extract_page(
+        session, downloads_url, with_parse(extract_download_links, cli_args)
     )
-    filename = archive_url.split('/')[-1]
+    formats = getattr(cli_args, 'formats', None) or [DOWNLOAD_FORMATS[0]]
+    if DOWNLOAD_FORMAT_ALL in formats:
+        formats = DOWNLOAD_FORMATS
+    archive_urls = list(dict.fromkeys(
+        urljoin(downloads_url, link) for link in links
+        if archive_format(link) in formats
+    ))
+    missing = set(formats) - set(map(archive_format, archive_urls))
+    if missing:
+        logging.info(INFO_DOWNLOAD_FORMATS.format(sorted(missing)))
     downloads_dir = BASE_DIR / DOWNLOAD_DIR
     downloads_dir.mkdir(exist_ok=True)
-    archive_path = downloads_dir / filename
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(INFO_DOWNLOAD.format(archive_path))
+    for archive_url, archive_path, downloaded, error in download_archives(
+        session,
+        archive_urls,
+        downloads_dir,
+        workers=getattr(cli_args, 'workers', WORKERS),
+        segments=getattr(cli_args, 'segments', DOWNLOAD_SEGMENTS),
+        pool_size=getattr(cli_args, 'pool_size', POOL_SIZE)
+    ):
+        if error is not None:
+            logging.info(INFO_URL_UNAVAILABLE.format(archive_url, error))
+        elif downloaded:
+            logging.info(INFO_DOWNLOAD.format(archive_path))
+        else:
+            logging.info(INFO_DOWNLOAD_SKIPPED.format(archive_path))
 
 
-def pep(session):
-    """Парсит статусы PEP: считает количество PEP в каждом статусе
-     и общее количество PEP."""
-    pattern_status = r'Status:\n(\w+)'
-    total_status = defaultdict(int)
-    soup = get_soup(session, PEPS_URL)
-    numerical_index = soup.find('section', attrs={'id': 'numerical-index'})
-    pep_string = numerical_index.find_all('tr')
-    messages = []
-    for item in tqdm(pep_string[1:], desc='calculate total_status'):
-        pep_table_status = item.find('abbr').text[1:]
-        pep_reference = item.find(
-            'a', attrs={'class': 'pep reference internal'}
-        )['href']
-        pep_link = urljoin(PEPS_URL, pep_reference)
-        try:
-            pep_soup = get_soup(session, pep_link)
-        except ConnectionError as error:
-            messages.append(INFO_URL_UNAVAILABLE.format(pep_link, error))
-            continue
-        field_list_simple = pep_soup.find(
-            'dl', attrs={'class': 'rfc2822 field-list simple'}
+def pep_index(session, cli_args=None):
+    """Собирает строки численного индекса PEP:
+    номер, ссылка на карточку и статус в таблице."""
+    from parsers import extract_pep_index
+    from utils import extract_page
+
+    return [
+        (number, urljoin(PEPS_URL, href), table_status)
+        for number, href, table_status in extract_page(
+            session, PEPS_URL, with_parse(extract_pep_index, cli_args)
         )
-        pep_status = re.search(pattern_status, field_list_simple.text)[1]
+    ]
+
+
+def pep_statuses(session, pep_links, cli_args=None):
+    """Загружает карточки PEP и достает из них статусы.
+    Возвращает кортежи (ссылка, статус, ошибка) в порядке ссылок."""
+    from parsers import extract_pep_status
+    from utils import extract_pages
+
+    return extract_pages(
+        with_parse(extract_pep_status, cli_args),
+        get_pages_engine(cli_args)(
+            session,
+            pep_links,
+            workers=getattr(cli_args, 'workers', WORKERS)
+        ),
+        processes=getattr(cli_args, 'processes', PROCESSES)
+    )
+
+
+def fetch_changed_peps(session, pep_rows, state, state_path, checkpoint,
+                       cli_args=None):
+    """Загружает карточки PEP (с --incremental - только изменившиеся)
+    и сразу заносит статусы в состояние. Состояние сохраняется каждые
+    FLUSH_ROWS карточек, поэтому после сбоя запуск с --incremental
+    продолжит с уже загруженного. Карточки из контрольной точки checkpoint
+    повторно не загружаются. Возвращает {ссылка: (статус, ошибка)}."""
+    from tqdm import tqdm
+
+    from checkpoints import resume_pages
+    from utils import write_json
+
+    incremental = getattr(cli_args, 'incremental', False)
+    changed_rows = {
+        pep_link: (number, pep_table_status)
+        for number, pep_link, pep_table_status in pep_rows
+        if not incremental
+        or state.get(number, {}).get('table_status') != pep_table_status
+    }
+    if incremental:
+        logging.info(
+            INFO_INCREMENTAL.format(len(changed_rows), len(pep_rows))
+        )
+    fetched_at = dt.datetime.now().isoformat(timespec='seconds')
+    fetched = {}
+    for count, (pep_link, pep_status, error) in enumerate(tqdm(
+        resume_pages(
+            checkpoint,
+            list(changed_rows),
+            partial(pep_statuses, session, cli_args=cli_args)
+        ),
+        total=len(changed_rows),
+        desc='calculate total_status'
+    ), 1):
+        fetched[pep_link] = pep_status, error
+        number, pep_table_status = changed_rows[pep_link]
+        if error is not None:
+            logging.info(INFO_URL_UNAVAILABLE.format(pep_link, error))
+        else:
+            state[number] = {
+                'number': number,
+                'table_status': pep_table_status,
+                'card_status': pep_status,
+                'fetched_at': fetched_at,
+            }
+        if count % FLUSH_ROWS == 0:
+            write_json(state_path, state)
+    return fetched
+
+
+def count_statuses(pep_rows, fetched, state, keep_mismatches=False):
+    """Считает статусы карточек по строкам индекса (номер, ссылка, статус
+    в таблице, позиция строки в индексе). Несовпадения статусов карточки
+    и таблицы записываются в лог сразу. Возвращает счетчики
+    {статус: [количество, позиция первой строки]} и список несовпадений -
+    только с keep_mismatches (нужен частичному результату шарда), иначе
+    пустой. Недоступные карточки убирает из состояния."""
+    statuses, mismatches = {}, []
+    for number, pep_link, pep_table_status, position in pep_rows:
+        if pep_link not in fetched:
+            pep_status = state[number]['card_status']
+        elif fetched[pep_link][1] is not None:
+            state.pop(number, None)
+            continue
+        else:
+            pep_status = fetched[pep_link][0]
         if pep_status not in EXPECTED_STATUS[pep_table_status]:
-            messages.append(
-                INFO_DIFFERENT_STATUS.format(
-                    pep_link,
-                    pep_status,
-                    EXPECTED_STATUS[pep_table_status]
-                )
-            )
-        total_status[pep_status] += 1
-    for log in messages:
-        logging.info(log)
-    # logging.info(*messages)  # не использую, т.к. запретил. Но работает же!
+            mismatch = {
+                'link': pep_link,
+                'card_status': pep_status,
+                'expected': EXPECTED_STATUS[pep_table_status],
+                'position': position,
+            }
+            log_mismatch(mismatch)
+            if keep_mismatches:
+                mismatches.append(mismatch)
+        statuses.setdefault(pep_status, [0, position])[0] += 1
+    return statuses, mismatches
+
+
+def log_mismatch(mismatch):
+    """Записывает в лог несовпадение статусов карточки и таблицы."""
+    logging.info(INFO_DIFFERENT_STATUS.format(
+        mismatch['link'],
+        mismatch['card_status'],
+        tuple(mismatch['expected'])
+    ))
+
+
+def totals_table(statuses):
+    """Итоговая таблица pep: статусы в порядке первого появления
+    в индексе PEP и общее количество."""
+    ordered = sorted(statuses.items(), key=lambda item: item[1][1])
     return [
         ('Status', 'Quantities'),
-        *total_status.items(),
-        ('Total', sum(total_status.values()))
+        *((status, count) for status, (count, _) in ordered),
+        ('Total', sum(count for count, _ in statuses.values()))
+    ]
+
+
+def pep(session, cli_args=None):
+    """Парсит статусы PEP: считает количество PEP в каждом статусе
+     и общее количество PEP. С --incremental загружает только карточки PEP,
+     которых нет в сохраненном состоянии или чей статус в индексе изменился.
+     С --shard i/N загружает только свою часть индекса и сохраняет
+     частичный результат для команды merge. С --resume продолжает
+     прерванный запуск с контрольной точки."""
+    from checkpoints import Checkpoint
+    from shards import shard_rows, write_partial
+    from utils import read_json, write_json
+
+    pep_rows = [
+        (*row, position)
+        for position, row in enumerate(pep_index(session, cli_args))
     ]
+    shard = getattr(cli_args, 'shard', None)
+    state_path = BASE_DIR / STATE_DIR / PEP_STATE_FILE
+    if shard:
+        pep_rows = shard_rows(pep_rows, shard)
+        state_path = BASE_DIR / STATE_DIR / PEP_SHARD_STATE_FILE.format(*shard)
+    state = read_json(state_path)
+    with Checkpoint(
+        checkpoint_path(state_path.stem), getattr(cli_args, 'resume', False)
+    ) as checkpoint:
+        fetched = fetch_changed_peps(
+            session, [row[:3] for row in pep_rows], state, state_path,
+            checkpoint, cli_args
+        )
+    statuses, mismatches = count_statuses(
+        pep_rows, fetched, state, keep_mismatches=bool(shard)
+    )
+    write_json(state_path, state)
+    if shard:
+        partial_path = BASE_DIR / RESULTS_DIR / PEP_SHARD_FILE.format(*shard)
+        write_partial(partial_path, shard, statuses, mismatches)
+        logging.info(INFO_SHARD_SAVED.format(*shard, partial_path))
+    return totals_table(statuses)
+
+
+def merge(session, cli_args=None):
+    """Объединяет частичные результаты pep --shard i/N всех шардов в ту же
+    итоговую таблицу, что и pep, и выводит ее как результат режима pep.
+    merge [ФАЙЛ ...] - по умолчанию все results/pep_shard_*.json."""
+    from shards import merge_partials
+
+    paths = [Path(path) for path in getattr(cli_args, 'params', None) or []]
+    statuses, mismatches = merge_partials(
+        paths or sorted((BASE_DIR / RESULTS_DIR).glob(PEP_SHARD_GLOB))
+    )
+    for mismatch in mismatches:
+        log_mismatch(mismatch)
+    pep_args = copy.copy(cli_args)
+    pep_args.mode, pep_args.params = 'pep', []
+    control_output(totals_table(statuses), pep_args)
+
+
+def cache(session, cli_args=None):
+    """Обслуживание кеша. cache compact - вытесняет давно не использованные
+    ответы сверх --cache-max-size и сжимает файл кеша (VACUUM)."""
+    from cache_utils import cache_db_path, compact_cache
+
+    params = getattr(cli_args, 'params', None) or [COMMAND_CACHE_COMPACT]
+    if params != [COMMAND_CACHE_COMPACT]:
+        raise ValueError(INFO_COMMAND_PARAMS.format('cache', params))
+    evicted, before, after = compact_cache(
+        session,
+        getattr(cli_args, 'cache_max_size', CACHE_MAX_SIZE) * MEGABYTE
+    )
+    logging.info(INFO_CACHE_COMPACT.format(
+        cache_db_path(session), evicted, before / MEGABYTE,
+        after / MEGABYTE, max(before - after, 0) / MEGABYTE
+    ))
+
+
+def index_docs(session, cli_args=None):
+    """Полнотекстовый индекс (SQLite FTS5) по архивам документации:
+    документы читаются прямо из архива, без распаковки на диск.
+    index [АРХИВ ...] - по умолчанию архивы HTML и текста из downloads
+    (от старых к новым, чтобы документы новой версии заменяли старые)."""
+    from download_utils import archive_format, file_sha256
+    from search_index import connect, index_archive
+
+    paths = [Path(path) for path in getattr(cli_args, 'params', None) or []]
+    if not paths and (BASE_DIR / DOWNLOAD_DIR).is_dir():
+        paths = sorted(
+            (
+                path for path in (BASE_DIR / DOWNLOAD_DIR).iterdir()
+                if archive_format(path.name) in INDEX_FORMATS
+            ),
+            key=lambda path: path.stat().st_mtime
+        )
+    if not paths:
+        logging.info(INFO_INDEX_EMPTY.format(BASE_DIR / DOWNLOAD_DIR))
+        return
+    connection = connect(BASE_DIR / SEARCH_DB)
+    try:
+        for path in paths:
+            counts = index_archive(
+                connection, path, archive_format(path.name) or path.name,
+                file_sha256(path)
+            )
+            if counts is None:
+                logging.info(INFO_INDEX_SKIPPED.format(path))
+            else:
+                logging.info(INFO_INDEXED.format(path, *counts))
+    finally:
+        connection.close()
+
+
+def search_docs(session, cli_args=None):
+    """Поиск по индексу документации: search СЛОВО ... (AND, OR, NOT,
+    слово* - по префиксу). Результаты в порядке релевантности выводятся
+    как результаты режима search."""
+    from search_index import connect, search
+
+    terms = getattr(cli_args, 'params', None)
+    if not terms:
+        raise ValueError(INFO_SEARCH_EMPTY)
+    started = time.perf_counter()
+    connection = connect(BASE_DIR / SEARCH_DB)
+    try:
+        rows = search(
+            connection, terms, getattr(cli_args, 'limit', SEARCH_LIMIT)
+        )
+    finally:
+        connection.close()
+    logging.info(INFO_SEARCH.format(
+        len(rows), (time.perf_counter() - started) * 1000
+    ))
+    control_output(
+        [('Архив', 'Документ', 'Заголовок', 'Фрагмент'), *rows], cli_args
+    )
+
+
+def watch(session, cli_args=None):
+    """Наблюдение за боковой панелью версий и индексом PEP: опрос условными
+    запросами каждые --interval секунд и вывод изменений в формате JSONL.
+    watch [latest-versions] [pep] - какие страницы наблюдать."""
+    from watcher import run_watch
+
+    run_watch(session, cli_args)
+
+
+def limit_cache_size(session, cli_args=None):
+    """Ограничивает размер кеша (--cache-max-size) после запуска."""
+    from cache_utils import limit_cache
+
+    evicted, freed = limit_cache(
+        session,
+        getattr(cli_args, 'cache_max_size', CACHE_MAX_SIZE) * MEGABYTE
+    )
+    if evicted:
+        logging.info(INFO_CACHE_EVICTED.format(evicted, freed / MEGABYTE))
+
+
+def output_mode(session, cli_args, lock=None):
+    """Запускает режим cli_args.mode и выводит его результаты.
+    С lock результаты сначала собираются, а выводятся под блокировкой,
+    чтобы выводы режимов, идущих параллельно, не перемешивались."""
+    results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+    if results is None:
+        return
+    if lock is None:
+        control_output(results, cli_args)
+        return
+    results = list(results)
+    with lock:
+        control_output(results, cli_args)
+
+
+def run_all(session, cli_args=None):
+    """Запускает несколько режимов параллельно на одной сессии (общие
+    пул соединений, кеш и планировщик запросов). Результаты каждого
+    режима выводятся отдельно, как при его собственном запуске.
+    all [режим ...] - какие режимы запустить (по умолчанию ALL_MODES).
+    Ошибка одного режима записывается в лог и не мешает остальным."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    modes = getattr(cli_args, 'params', None) or list(ALL_MODES)
+    unknown = [mode for mode in modes if mode not in MODE_TO_FUNCTION]
+    if unknown:
+        raise ValueError(INFO_COMMAND_PARAMS.format('all', unknown))
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        futures = {}
+        for mode in dict.fromkeys(modes):
+            mode_args = copy.copy(cli_args)
+            mode_args.mode, mode_args.params = mode, []
+            futures[executor.submit(
+                output_mode, session, mode_args, lock
+            )] = mode
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                logging.error(INFO_MODE_ERROR.format(
+                    futures[future], future.exception()
+                ))
+    limit_cache_size(session, cli_args)
+
+
+def run_mode(session, cli_args):
+    """Запускает режим или команду и выводит результаты режима.
+    После запуска ограничивает размер кеша (--cache-max-size)."""
+    if cli_args.mode in COMMAND_TO_FUNCTION:
+        COMMAND_TO_FUNCTION[cli_args.mode](session, cli_args)
+        return
+    output_mode(session, cli_args)
+    limit_cache_size(session, cli_args)
 
 
 MODE_TO_FUNCTION = {
@@ -166,24 +593,40 @@ MODE_TO_FUNCTION = {
     'download': download,
     'pep': pep,
 }
+# Служебные команды: не режимы парсера, результатов не выводят.
+COMMAND_TO_FUNCTION = {
+    'all': run_all,
+    'cache': cache,
+    'index': index_docs,
+    'merge': merge,
+    'search': search_docs,
+    'watch': watch,
+}
 
 
 def main():
     """Запускает парсер через аргументы командной строки"""
     configure_logging()
     logging.info(INFO_START)
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser(
+        (*MODE_TO_FUNCTION, *COMMAND_TO_FUNCTION)
+    )
     args = arg_parser.parse_args()
+    if args.params and args.mode in MODE_TO_FUNCTION:
+        arg_parser.error(INFO_MODE_PARAMS.format(args.mode, args.params))
     logging.info(INFO_ARGS.format(args))
     try:
-        session = requests_cache.CachedSession()
+        session = configure_session(args)
         if args.clear_cache:
             session.cache.clear()
-        results = MODE_TO_FUNCTION[args.mode](session)
-        if results is not None:
-            control_output(results, args)
+        if args.profile:
+            from profiling import profile_call
+            profile_call(args, run_mode, session, args)
+        else:
+            run_mode(session, args)
     except Exception as error:
         logging.error(INFO_ERROR.format(error))
+    report_metrics(args)
     logging.info(INFO_FINISH)
 
 
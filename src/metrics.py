@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from constants import INFO_METRICS, INFO_METRICS_SAVED, STAGE_FETCH
+
+FIELDS = ('calls', 'errors', 'seconds', 'bytes', 'cache_hits', 'cache_misses')
+PROMETHEUS_HELP = {
+    'calls': 'Вызовов этапа за последний запуск.',
+    'errors': 'Ошибок этапа за последний запуск.',
+    'seconds': 'Суммарное время этапа за последний запуск, с.',
+    'bytes': 'Байт получено на этапе за последний запуск.',
+    'cache_hits': 'Ответов из кеша за последний запуск.',
+    'cache_misses': 'Ответов из сети за последний запуск.',
+}
+
+
+class Metrics:
+    """Счетчики этапов запуска: вызовы, ошибки, время, байты,
+    попадания и промахи кеша. Потокобезопасны."""
+
+    def __init__(self):
+        self.stages = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds, size=0, from_cache=None,
+                error=False):
+        with self.lock:
+            counters = self.stages[stage]
+            counters['calls'] += 1
+            counters['errors'] += bool(error)
+            counters['seconds'] += seconds
+            counters['bytes'] += size
+            if from_cache is not None:
+                counters['cache_hits' if from_cache else 'cache_misses'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {stage: dict(counters)
+                    for stage, counters in self.stages.items()}
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+
+metrics = Metrics()
+
+
+def observe_response(response, seconds, stage=STAGE_FETCH):
+    """Учитывает загрузку страницы: время, размер и попадание в кеш."""
+    metrics.observe(
+        stage,
+        seconds,
+        len(response.content),
+        getattr(response, 'from_cache', False),
+    )
+
+
+def timed_call(function, *args):
+    """Вызывает function и возвращает (результат, время в секундах).
+    Функция уровня модуля, чтобы ее можно было передать в пул процессов."""
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def summary_table(stages):
+    """Итоговая таблица по этапам запуска."""
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = (
+        'Этап', 'Вызовов', 'Ошибок', 'Время, с', 'Среднее, мс', 'КБ',
+        'Из кеша', 'Из сети'
+    )
+    table.align = 'l'
+    for stage, counters in stages.items():
+        table.add_row((
+            stage, counters['calls'], counters['errors'],
+            f'{counters["seconds"]:.3f}',
+            f'{counters["seconds"] * 1000 / counters["calls"]:.1f}',
+            f'{counters["bytes"] / 1024:.1f}',
+            counters['cache_hits'], counters['cache_misses'],
+        ))
+    return table.get_string()
+
+
+def to_prometheus(stages, mode):
+    """Метрики в текстовом формате Prometheus (textfile collector)."""
+    lines = []
+    for field in FIELDS:
+        name = f'parser_stage_{field}'
+        lines.append(f'# HELP {name} {PROMETHEUS_HELP[field]}')
+        lines.append(f'# TYPE {name} gauge')
+        for stage, counters in stages.items():
+            lines.append(
+                f'{name}{{mode="{mode}",stage="{stage}"}} {counters[field]}'
+            )
+    lines.append('# HELP parser_last_run_timestamp_seconds Время запуска.')
+    lines.append('# TYPE parser_last_run_timestamp_seconds gauge')
+    lines.append(
+        f'parser_last_run_timestamp_seconds{{mode="{mode}"}} {time.time()}'
+    )
+    return '\n'.join(lines) + '\n'
+
+
+def export_metrics(path, mode, stages):
+    """Атомарно пишет метрики: *.prom - для node exporter, иначе JSON."""
+    if path.suffix == '.prom':
+        text = to_prometheus(stages, mode)
+    else:
+        text = json.dumps(
+            {'mode': mode, 'stages': stages}, ensure_ascii=False, indent=2
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    temp_path.write_text(text, encoding='utf-8')
+    os.replace(temp_path, path)
+
+
+def report_metrics(cli_args):
+    """Логирует итоговую таблицу этапов и выгружает метрики (--metrics)."""
+    stages = metrics.snapshot()
+    if not stages:
+        return
+    logging.info(INFO_METRICS.format(summary_table(stages)))
+    path = getattr(cli_args, 'metrics', None)
+    if path is not None:
+        export_metrics(path, getattr(cli_args, 'mode', None), stages)
+        logging.info(INFO_METRICS_SAVED.format(path))
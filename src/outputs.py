@@ -1,30 +1,40 @@
 import csv
 import datetime as dt
 import logging
+import sys
 
-from prettytable import PrettyTable
-
-from constants import (BASE_DIR, DATETIME_FORMAT, INFO_SAVE, PARSER_FILE,
-                       PARSER_PRETTY, RESULTS_DIR)
+from constants import (BASE_DIR, DATETIME_FORMAT, FLUSH_ROWS, INFO_SAVE,
+                       INFO_SAVE_DB, PARSER_FILE, PARSER_PRETTY,
+                       PARSER_SQLITE, RESULTS_DB, RESULTS_DIR)
 
 
 def default_output(results, cli_args):
-    """Вывод данных по умолчанию (построчно)."""
-    for row in results:
+    """Вывод данных по умолчанию (построчно, по мере получения строк)."""
+    for number, row in enumerate(results, 1):
         print(*row)
+        if number % FLUSH_ROWS == 0:
+            sys.stdout.flush()
 
 
 def pretty_output(results, cli_args):
-    """Вывод данных в формате таблицы"""
+    """Вывод данных в формате таблицы (ширине колонок нужны все строки)."""
+    from prettytable import PrettyTable
+
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows(list(rows))
     print(table)
 
 
 def file_output(results, cli_args):
-    """Создает директорию и записывает данные в файл."""
+    """Создает директорию и записывает данные в файл по мере получения
+    строк. Файл создается после заголовка, то есть когда режим успешно
+    начал работу; уже полученные строки сохраняются, даже если режим
+    упадет позже."""
+    rows = iter(results)
+    header = next(rows)
     results_dir = BASE_DIR / RESULTS_DIR
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
@@ -33,13 +43,35 @@ def file_output(results, cli_args):
     file_name = f'{parser_mode}_{now_formatted}.csv'
     file_path = results_dir / file_name
     with open(file_path, 'w', encoding='utf-8') as f:
-        csv.writer(f, dialect=csv.unix_dialect).writerows(results)
+        writer = csv.writer(f, dialect=csv.unix_dialect)
+        writer.writerow(header)
+        for number, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if number % FLUSH_ROWS == 0:
+                f.flush()
     logging.info(INFO_SAVE.format(file_path))
 
 
+def sqlite_output(results, cli_args):
+    """Записывает строки в базу SQLite с историей запусков."""
+    from results_db import connect, save_rows, start_run
+
+    rows = iter(results)
+    header = next(rows)
+    db_path = BASE_DIR / RESULTS_DB
+    connection = connect(db_path)
+    try:
+        run_id = start_run(connection, cli_args.mode, header)
+        count = save_rows(connection, cli_args.mode, run_id, rows)
+    finally:
+        connection.close()
+    logging.info(INFO_SAVE_DB.format(db_path, count, run_id))
+
+
 CONTROL_OBJECTS = {
     PARSER_PRETTY: pretty_output,
     PARSER_FILE: file_output,
+    PARSER_SQLITE: sqlite_output,
     None: default_output
 }
 
@@ -47,7 +79,8 @@ CONTROL_OBJECTS = {
 def control_output(results, cli_args):
     """
     Отвечает за контроль выходных данных парсера:
-    results — список с результатами results из функции main() файла main.py
+    results — строки результатов режима (список или генератор), первая
+    строка - заголовок
     cli_args — объект с аргументами командной строки
     """
     CONTROL_OBJECTS[cli_args.output](results, cli_args)
@@ -0,0 +1,242 @@
+import re
+
+import lxml.html
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+
+from constants import (BACKEND_LXML, INFO_ALL_VERSHIONS_NOT_FOUND,
+                       INFO_TAG_ERROR, PARSE_PARTIAL, PARSE_TO_BACKEND)
+from exceptions import ParserFindKeyWordException, ParserFindTagException
+from utils import find_tag
+
+PATTERN_STATUS = r'Status:\n(\w+)'
+PATTERN_VERSION = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+
+
+def has_class(name):
+    """Условие на атрибут class: SoupStrainer при разборе видит class
+    одной строкой, поэтому сверяем отдельные слова регуляркой."""
+    return re.compile(rf'(^|\s){name}(\s|$)')
+
+
+def xpath_class(name):
+    """Условие XPath на одно из слов атрибута class (как .name в CSS)."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# Части страниц, которые читает каждый режим.
+WHATS_NEW_INDEX_ONLY = SoupStrainer(
+    'section', attrs={'id': 'what-s-new-in-python'}
+)
+WHATS_NEW_ONLY = SoupStrainer(['h1', 'dl'])
+LATEST_VERSIONS_ONLY = SoupStrainer(
+    'div', attrs={'class': has_class('sphinxsidebarwrapper')}
+)
+DOWNLOAD_ONLY = SoupStrainer('table', attrs={'class': has_class('docutils')})
+PEP_INDEX_ONLY = SoupStrainer('section', attrs={'id': 'numerical-index'})
+PEP_ONLY = SoupStrainer('dl', attrs={'class': has_class('rfc2822')})
+
+# Быстрый путь: lxml без построения дерева BeautifulSoup.
+# Выражения повторяют CSS-селекторы и вызовы find пути BeautifulSoup.
+H1_XPATH = etree.XPath('(//h1)[1]')
+DL_XPATH = etree.XPath('(//dl)[1]')
+PEP_XPATH = etree.XPath('(//dl[@class="rfc2822 field-list simple"])[1]')
+WHATS_NEW_LINKS_XPATH = etree.XPath(
+    f'//*[@id="what-s-new-in-python"]//div[{xpath_class("toctree-wrapper")}]'
+    f'//li[{xpath_class("toctree-l1")}]/a'
+)
+SIDEBAR_LISTS_XPATH = etree.XPath(
+    f'//div[{xpath_class("sphinxsidebarwrapper")}]//ul'
+)
+DOWNLOAD_XPATH = etree.XPath(f'//table[{xpath_class("docutils")}]//a[@href]')
+PEP_INDEX_XPATH = etree.XPath('(//section[@id="numerical-index"])[1]')
+PEP_REFERENCE_XPATH = etree.XPath(
+    '(.//a[@class="pep reference internal"])[1]'
+)
+ABBR_XPATH = etree.XPath('(.//abbr)[1]')
+
+
+def find_node(tree, xpath, tag, attrs=None):
+    """Аналог find_tag для быстрого пути на lxml."""
+    nodes = xpath(tree)
+    if not nodes:
+        raise ParserFindTagException(INFO_TAG_ERROR.format(tag, attrs))
+    return nodes[0]
+
+
+def make_soup(html, parse, parse_only, parse_settings='lxml'):
+    """Готовит суп из текста страницы: целиком или только нужную часть."""
+    return BeautifulSoup(
+        html,
+        parse_settings,
+        parse_only=parse_only if parse == PARSE_PARTIAL else None
+    )
+
+
+def build_tree(html, parse, strainer=None):
+    """Дерево страницы для движка разбора, которому соответствует parse."""
+    if PARSE_TO_BACKEND[parse] == BACKEND_LXML:
+        return lxml.html.fromstring(html)
+    return make_soup(html, parse, strainer)
+
+
+class Extractor:
+    """Функция разбора страницы (html, parse) с отдельной реализацией
+    для каждого движка разбора: реализация получает готовое дерево
+    и возвращает одинаковый результат на любом движке. Новый движок -
+    это новый ключ в PARSE_TO_BACKEND и реализации под этим ключом.
+    Экземпляры можно передавать в пул процессов."""
+
+    def __init__(self, name, strainer=None, **backends):
+        self.__name__ = name
+        self.strainer = strainer
+        self.backends = backends
+
+    def __call__(self, html, parse=PARSE_PARTIAL):
+        return self.backends[PARSE_TO_BACKEND[parse]](
+            build_tree(html, parse, self.strainer)
+        )
+
+    def __repr__(self):
+        return f'<Extractor {self.__name__}>'
+
+
+def whats_new_links_soup(soup):
+    return [
+        reference['href'] for reference in soup.select(
+            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 >a'
+        )
+    ]
+
+
+def whats_new_links_lxml(tree):
+    return [reference.get('href') for reference in WHATS_NEW_LINKS_XPATH(tree)]
+
+
+def whats_new_soup(soup):
+    return find_tag(soup, 'h1').text, find_tag(soup, 'dl').text
+
+
+def whats_new_lxml(tree):
+    return (
+        find_node(tree, H1_XPATH, 'h1').text_content(),
+        find_node(tree, DL_XPATH, 'dl').text_content()
+    )
+
+
+def latest_versions_soup(soup):
+    for ul in soup.select('div.sphinxsidebarwrapper ul'):
+        if 'All versions' in ul.text:
+            return [(a_tag['href'], a_tag.text) for a_tag in ul.find_all('a')]
+    raise ParserFindKeyWordException(INFO_ALL_VERSHIONS_NOT_FOUND)
+
+
+def latest_versions_lxml(tree):
+    for ul in SIDEBAR_LISTS_XPATH(tree):
+        if 'All versions' in ul.text_content():
+            return [
+                (a_tag.get('href'), a_tag.text_content())
+                for a_tag in ul.iter('a')
+            ]
+    raise ParserFindKeyWordException(INFO_ALL_VERSHIONS_NOT_FOUND)
+
+
+def download_links_soup(soup):
+    links = [
+        link['href'] for link in soup.select('table.docutils a[href]')
+    ]
+    if not links:
+        raise ParserFindTagException(
+            INFO_TAG_ERROR.format('a', {'href': True})
+        )
+    return links
+
+
+def download_links_lxml(tree):
+    links = [link.get('href') for link in DOWNLOAD_XPATH(tree)]
+    if not links:
+        raise ParserFindTagException(
+            INFO_TAG_ERROR.format('a', {'href': True})
+        )
+    return links
+
+
+def pep_index_soup(soup):
+    numerical_index = find_tag(
+        soup, 'section', attrs={'id': 'numerical-index'}
+    )
+    pep_rows = []
+    for item in numerical_index.find_all('tr')[1:]:
+        reference = item.find('a', attrs={'class': 'pep reference internal'})
+        pep_rows.append(
+            (reference.text, reference['href'], item.find('abbr').text[1:])
+        )
+    return pep_rows
+
+
+def pep_index_lxml(tree):
+    numerical_index = find_node(
+        tree, PEP_INDEX_XPATH, 'section', {'id': 'numerical-index'}
+    )
+    pep_rows = []
+    for item in list(numerical_index.iter('tr'))[1:]:
+        reference = PEP_REFERENCE_XPATH(item)[0]
+        pep_rows.append((
+            reference.text_content(),
+            reference.get('href'),
+            ABBR_XPATH(item)[0].text_content()[1:]
+        ))
+    return pep_rows
+
+
+def version_status(text):
+    """Версия и статус из подписи ссылки «Python 3.12 (stable)»;
+    подписи другого вида возвращаются целиком с пустым статусом."""
+    match = re.search(PATTERN_VERSION, text)
+    if match is None:
+        return text, ''
+    return match['version'], match['status']
+
+
+def pep_status_soup(soup):
+    return re.search(PATTERN_STATUS, find_tag(
+        soup, 'dl', attrs={'class': 'rfc2822 field-list simple'}
+    ).text)[1]
+
+
+def pep_status_lxml(tree):
+    return re.search(PATTERN_STATUS, find_node(
+        tree, PEP_XPATH, 'dl', attrs={'class': 'rfc2822 field-list simple'}
+    ).text_content())[1]
+
+
+# Ссылки на статьи из оглавления «What's New».
+extract_whats_new_links = Extractor(
+    'extract_whats_new_links', WHATS_NEW_INDEX_ONLY,
+    soup=whats_new_links_soup, lxml=whats_new_links_lxml
+)
+# Заголовок и сведения об авторах из статьи о нововведениях.
+extract_whats_new = Extractor(
+    'extract_whats_new', WHATS_NEW_ONLY,
+    soup=whats_new_soup, lxml=whats_new_lxml
+)
+# Ссылки и подписи из списка «All versions» боковой панели.
+extract_latest_versions = Extractor(
+    'extract_latest_versions', LATEST_VERSIONS_ONLY,
+    soup=latest_versions_soup, lxml=latest_versions_lxml
+)
+# Ссылки на архивы документации из таблицы загрузки.
+extract_download_links = Extractor(
+    'extract_download_links', DOWNLOAD_ONLY,
+    soup=download_links_soup, lxml=download_links_lxml
+)
+# Строки численного индекса PEP: номер, ссылка, статус в таблице.
+extract_pep_index = Extractor(
+    'extract_pep_index', PEP_INDEX_ONLY,
+    soup=pep_index_soup, lxml=pep_index_lxml
+)
+# Статус из карточки PEP.
+extract_pep_status = Extractor(
+    'extract_pep_status', PEP_ONLY,
+    soup=pep_status_soup, lxml=pep_status_lxml
+)
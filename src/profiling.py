@@ -0,0 +1,121 @@
+import cProfile
+import datetime as dt
+import io
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+
+from constants import (DATETIME_FORMAT, INFO_PROFILE, LOG_DIR,
+                       PROFILE_DETERMINISTIC, PROFILE_INTERVAL, PROFILE_TOP)
+
+
+def frame_stack(frame, root=None):
+    """Стек кадра от корня (или от кадра root, не включая его): ключи
+    функций в формате pstats (файл, строка, имя)."""
+    stack = []
+    while frame is not None and frame is not root:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class StackSampler(threading.Thread):
+    """Раз в interval секунд снимает стеки всех потоков, кроме своего.
+    Стек потока, запустившего профилирование, обрезается по кадру root."""
+
+    def __init__(self, interval=PROFILE_INTERVAL, root=None):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != self.ident:
+                    stack = frame_stack(frame, self.root)
+                    if stack:
+                        self.stacks[stack] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def samples_to_stats(stacks, interval):
+    """Переводит выборки стеков в словарь статистики pstats:
+    собственное и полное время функций и связи вызывающий-вызываемый."""
+    stats = {}
+    for stack, count in stacks.items():
+        seconds = count * interval
+        for depth, key in enumerate(stack):
+            entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            entry[1] += count
+            if key not in stack[:depth]:
+                entry[0] += count
+                entry[3] += seconds
+            if depth:
+                caller = stack[depth - 1]
+                entry[4][caller] = entry[4].get(caller, 0) + count
+        stats[stack[-1]][2] += seconds
+    return {key: tuple(entry) for key, entry in stats.items()}
+
+
+def frame_label(key):
+    filename, line, name = key
+    return f'{name} ({os.path.basename(filename)}:{line})'.replace(';', ',')
+
+
+def save_profile(base_path, stacks, interval, profiler=None, top=PROFILE_TOP):
+    """Сохраняет профиль: <base>.pstats, <base>.collapsed (свернутые стеки
+    для flamegraph.pl/speedscope) и <base>.txt (топ функций)."""
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+    pstats_path = base_path.with_suffix('.pstats')
+    if profiler is not None:
+        profiler.dump_stats(pstats_path)
+    else:
+        with open(pstats_path, 'wb') as file:
+            marshal.dump(samples_to_stats(stacks, interval), file)
+    with open(base_path.with_suffix('.collapsed'), 'w') as file:
+        for stack, count in stacks.most_common():
+            file.write(';'.join(map(frame_label, stack)) + f' {count}\n')
+    report = io.StringIO()
+    stats = pstats.Stats(str(pstats_path), stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+    base_path.with_suffix('.txt').write_text(report.getvalue())
+    return report.getvalue()
+
+
+def profile_call(cli_args, function, *args):
+    """Выполняет function под профилировщиком --profile: cprofile -
+    детерминированный (cProfile, поток main), sampling - выборка стеков
+    всех потоков. Стеки для flamegraph снимаются в обоих случаях."""
+    base_path = LOG_DIR / 'profile_{}_{}'.format(
+        getattr(cli_args, 'mode', 'run'),
+        dt.datetime.now().strftime(DATETIME_FORMAT)
+    )
+    top = getattr(cli_args, 'profile_top', PROFILE_TOP)
+    profiler = None
+    if cli_args.profile == PROFILE_DETERMINISTIC:
+        profiler = cProfile.Profile()
+    sampler = StackSampler(root=sys._getframe())
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return function(*args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        save_profile(
+            base_path, sampler.stacks, sampler.interval, profiler, top
+        )
+        logging.info(INFO_PROFILE.format(base_path, top))
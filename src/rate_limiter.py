@@ -0,0 +1,89 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from constants import (RATE_DECREASE, RATE_INCREASE, RATE_LIMIT_MAX,
+                       RATE_LIMIT_MIN, THROTTLE_STATUSES)
+
+
+def parse_retry_after(value):
+    """Переводит заголовок Retry-After (секунды или HTTP-дата) в секунды."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Корзина токенов одного хоста: rate запросов в секунду,
+    не более burst запросов подряд."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def reserve(self):
+        """Забирает токен и возвращает, сколько секунд ждать до запроса."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(delay, self.blocked_until - now)
+
+
+class RateLimiter:
+    """Планировщик запросов: своя корзина токенов для каждого хоста.
+    Соблюдает Retry-After и снижает темп при росте ошибок (AIMD):
+    ошибка - темп умножается на RATE_DECREASE, успех - растет
+    на RATE_INCREASE запросов в секунду, но не выше max_rate."""
+
+    def __init__(self, rate, burst, max_rate=RATE_LIMIT_MAX,
+                 min_rate=RATE_LIMIT_MIN):
+        self.rate = rate
+        self.burst = burst
+        self.max_rate = max(rate, max_rate)
+        self.min_rate = min(rate, min_rate)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    def reserve(self, host):
+        """Резервирует запрос к хосту, возвращает задержку в секундах."""
+        with self.lock:
+            return self.bucket(host).reserve()
+
+    def wait(self, host):
+        """Блокирует поток, пока к хосту нельзя обращаться."""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def feedback(self, host, status=None, retry_after=None):
+        """Подстраивает темп по ответу хоста. status=None - ошибка соединения.
+        """
+        with self.lock:
+            bucket = self.bucket(host)
+            if status is None or status in THROTTLE_STATUSES:
+                bucket.rate = max(self.min_rate, bucket.rate * RATE_DECREASE)
+                bucket.tokens = min(bucket.tokens, 0)
+                delay = parse_retry_after(retry_after)
+                if delay:
+                    bucket.blocked_until = max(
+                        bucket.blocked_until, time.monotonic() + delay
+                    )
+            elif status < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + RATE_INCREASE)
@@ -0,0 +1,104 @@
+import datetime as dt
+import json
+import sqlite3
+from itertools import islice
+
+from constants import BATCH_ROWS, MODE_TO_KEY_COLUMN
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    header TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    mode TEXT NOT NULL,
+    key TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    data TEXT NOT NULL,
+    PRIMARY KEY (mode, key, run_id)
+);
+CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id);
+CREATE TABLE IF NOT EXISTS latest (
+    mode TEXT NOT NULL,
+    key TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    first_run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    data TEXT NOT NULL,
+    PRIMARY KEY (mode, key)
+);
+'''
+INSERT_RESULT = '''
+INSERT INTO results (mode, key, run_id, data) VALUES (?, ?, ?, ?)
+ON CONFLICT (mode, key, run_id) DO UPDATE SET data = excluded.data
+'''
+UPSERT_LATEST = '''
+INSERT INTO latest (mode, key, run_id, first_run_id, data)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (mode, key) DO UPDATE
+SET run_id = excluded.run_id, data = excluded.data
+'''
+
+
+def connect(path):
+    """Открывает базу результатов и создает таблицы, если их нет."""
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def to_text(value):
+    """Значение ячейки для JSON: байты (whats-new) - в строку."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def start_run(connection, mode, header):
+    """Заводит запись о запуске и возвращает его run_id."""
+    with connection:
+        return connection.execute(
+            'INSERT INTO runs (mode, started_at, header) VALUES (?, ?, ?)',
+            (
+                mode,
+                dt.datetime.now().isoformat(timespec='seconds'),
+                json.dumps([to_text(name) for name in header]),
+            )
+        ).lastrowid
+
+
+def save_rows(connection, mode, run_id, rows, batch_rows=BATCH_ROWS):
+    """Пишет строки запуска пачками по batch_rows, каждая пачка - одна
+    транзакция. Строки ключуются естественным ключом режима (номер версии,
+    ссылка на статью, статус PEP): в results копится история по запускам,
+    в latest - последнее значение каждого ключа. После последней пачки
+    из latest удаляются ключи режима, которых в этом запуске не было
+    (например, статус PEP, которого больше нет), чтобы latest совпадала
+    с последним запуском. Возвращает число строк."""
+    key_column = MODE_TO_KEY_COLUMN.get(mode, 0)
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = [
+            (mode, str(to_text(row[key_column])), run_id,
+             json.dumps([to_text(value) for value in row],
+                        ensure_ascii=False))
+            for row in islice(rows, batch_rows)
+        ]
+        if not batch:
+            with connection:
+                connection.execute(
+                    'DELETE FROM latest WHERE mode = ? AND run_id != ?',
+                    (mode, run_id)
+                )
+            return count
+        with connection:
+            connection.executemany(INSERT_RESULT, batch)
+            connection.executemany(
+                UPSERT_LATEST,
+                [(mode, key, run, run, data) for mode, key, run, data in batch]
+            )
+        count += len(batch)
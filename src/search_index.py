@@ -0,0 +1,179 @@
+import datetime as dt
+import re
+import sqlite3
+import tarfile
+import zipfile
+
+import lxml.html
+
+from constants import INDEX_EXTENSIONS
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS archives (
+    name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    source TEXT NOT NULL,
+    path TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (source, path)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    title, body, tokenize = 'porter unicode61'
+);
+'''
+SEARCH = '''
+SELECT entries.source, entries.path, documents.title,
+       snippet(documents, 1, '[', ']', '...', 12)
+FROM documents JOIN entries ON entries.doc_id = documents.rowid
+WHERE documents MATCH ?
+ORDER BY rank
+LIMIT ?
+'''
+FTS_OPERATORS = ('AND', 'OR', 'NOT')
+
+
+def connect(path):
+    """Открывает поисковый индекс и создает таблицы, если их нет."""
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def relative_path(name):
+    """Путь документа внутри архива без каталога верхнего уровня
+    (python-3.12.1-docs-text/library/os.txt - library/os.txt), чтобы
+    документы новой версии архива заменяли документы старой."""
+    return name.split('/', 1)[-1]
+
+
+def iter_entries(path):
+    """Потоково отдает документы архива zip или tar.bz2, не распаковывая
+    его на диск: (путь, подпись, функция чтения содержимого). Подпись
+    (CRC и размер для zip, размер и время для tar) позволяет пропустить
+    неизменившийся документ, не читая его."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.filename.endswith(INDEX_EXTENSIONS):
+                    continue
+                yield (
+                    relative_path(info.filename),
+                    f'{info.CRC}:{info.file_size}',
+                    lambda info=info: archive.read(info)
+                )
+        return
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(
+                INDEX_EXTENSIONS
+            ):
+                continue
+            yield (
+                relative_path(member.name),
+                f'{member.size}:{member.mtime}',
+                lambda member=member: archive.extractfile(member).read()
+            )
+
+
+def document_text(path, content):
+    """Заголовок и текст документа: для HTML - основная часть страницы
+    без скриптов и стилей, для текста - первая непустая строка."""
+    text = content.decode('utf-8', errors='replace')
+    if not path.endswith(('.html', '.htm')):
+        title = next(
+            (line.strip() for line in text.splitlines() if line.strip()), ''
+        )
+        return title, text
+    if not text.strip():
+        return '', ''
+    # Архивы документации в UTF-8; без объявления кодировки lxml
+    # разбирал бы байты как latin-1.
+    tree = lxml.html.fromstring(text)
+    for node in tree.xpath('//script | //style'):
+        node.drop_tree()
+    main = tree.xpath('(//*[@role="main"])[1]')
+    title = tree.findtext('.//title') or ''
+    body = (main[0] if main else tree).text_content()
+    return title.strip(), re.sub(r'\s+', ' ', body).strip()
+
+
+def index_archive(connection, path, source, sha256):
+    """Добавляет в индекс документы архива path формата source.
+    Архив с той же контрольной суммой пропускается целиком, в новом
+    архиве переиндексируются только изменившиеся документы, документы,
+    которых в архиве больше нет, удаляются. Возвращает (добавлено
+    или обновлено, без изменений, удалено) или None, если архив
+    не менялся."""
+    if connection.execute(
+        'SELECT 1 FROM archives WHERE name = ? AND sha256 = ?',
+        (path.name, sha256)
+    ).fetchone():
+        return None
+    known = dict(connection.execute(
+        'SELECT path, signature FROM entries WHERE source = ?', (source,)
+    ))
+    updated = unchanged = 0
+    with connection:
+        for doc_path, signature, read in iter_entries(path):
+            if known.pop(doc_path, None) == signature:
+                unchanged += 1
+                continue
+            delete_document(connection, source, doc_path)
+            doc_id = connection.execute(
+                'INSERT INTO documents (title, body) VALUES (?, ?)',
+                document_text(doc_path, read())
+            ).lastrowid
+            connection.execute(
+                'INSERT INTO entries (source, path, signature, doc_id) '
+                'VALUES (?, ?, ?, ?)', (source, doc_path, signature, doc_id)
+            )
+            updated += 1
+        for doc_path in known:
+            delete_document(connection, source, doc_path)
+        connection.execute(
+            'INSERT OR REPLACE INTO archives (name, sha256, indexed_at) '
+            'VALUES (?, ?, ?)',
+            (path.name, sha256, dt.datetime.now().isoformat('T', 'seconds'))
+        )
+    return updated, unchanged, len(known)
+
+
+def delete_document(connection, source, doc_path):
+    """Удаляет документ из индекса, если он там есть."""
+    row = connection.execute(
+        'SELECT doc_id FROM entries WHERE source = ? AND path = ?',
+        (source, doc_path)
+    ).fetchone()
+    if row is None:
+        return
+    connection.execute('DELETE FROM documents WHERE rowid = ?', row)
+    connection.execute(
+        'DELETE FROM entries WHERE source = ? AND path = ?', (source, doc_path)
+    )
+
+
+def fts_query(terms):
+    """Запрос FTS5 из слов: каждое слово берется в кавычки, чтобы точки
+    и дефисы (os.path, --help) не ломали синтаксис; AND/OR/NOT
+    остаются операторами, слово* - поиск по префиксу."""
+    parts = []
+    for term in terms:
+        if term in FTS_OPERATORS:
+            parts.append(term)
+            continue
+        prefix = term.endswith('*') and len(term) > 1
+        word = term[:-1] if prefix else term
+        parts.append('"{}"{}'.format(word.replace('"', '""'), '*' * prefix))
+    return ' '.join(parts)
+
+
+def search(connection, terms, limit):
+    """Документы, подходящие под запрос, в порядке релевантности (BM25):
+    (формат архива, путь, заголовок, фрагмент с найденными словами)."""
+    return connection.execute(SEARCH, (fts_query(terms), limit)).fetchall()
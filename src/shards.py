@@ -0,0 +1,49 @@
+from constants import INFO_SHARDS_INVALID
+from utils import read_json, write_json
+
+
+def in_shard(number, shard):
+    """Попадает ли PEP с номером number в шард (i, N): номер по модулю N.
+    Разбиение детерминировано и не зависит от порядка строк индекса."""
+    index, total = shard
+    return int(number) % total == index - 1
+
+
+def shard_rows(pep_rows, shard):
+    """Строки индекса PEP, которые загружает шард (i, N)."""
+    return [row for row in pep_rows if in_shard(row[0], shard)]
+
+
+def write_partial(path, shard, statuses, mismatches):
+    """Сохраняет частичный результат шарда: счетчики статусов
+    {статус: [количество, позиция первой строки в индексе]}
+    и несовпадения статусов."""
+    write_json(path, {
+        'shard': list(shard),
+        'statuses': statuses,
+        'mismatches': mismatches,
+    })
+
+
+def merge_partials(paths):
+    """Объединяет частичные результаты шардов 1..N одного разбиения.
+    Возвращает (statuses, mismatches) в том же виде, что и у шарда.
+    Если шардов не хватает или они повторяются - ValueError."""
+    partials = [read_json(path) for path in paths]
+    shards = sorted(tuple(partial.get('shard', ())) for partial in partials)
+    totals = {total for _, total in shards}
+    if len(totals) != 1 or shards != [
+        (index, total) for total in totals for index in range(1, total + 1)
+    ]:
+        raise ValueError(INFO_SHARDS_INVALID.format(
+            [f'{index}/{total}' for index, total in shards]
+        ))
+    statuses, mismatches = {}, []
+    for partial in partials:
+        for status, (count, first) in partial['statuses'].items():
+            merged = statuses.setdefault(status, [0, first])
+            merged[0] += count
+            merged[1] = min(merged[1], first)
+        mismatches.extend(partial['mismatches'])
+    mismatches.sort(key=lambda mismatch: mismatch['position'])
+    return statuses, mismatches
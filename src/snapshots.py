@@ -0,0 +1,124 @@
+import json
+import threading
+import zlib
+
+from requests.adapters import BaseAdapter
+
+from constants import (INFO_NOT_IN_SNAPSHOT, SNAPSHOT_INDEX_FILE,
+                       SNAPSHOT_PACK_FILE)
+from utils import build_response
+
+
+def snapshot_key(method, url):
+    """Ключ записи снимка: метод и адрес запроса."""
+    return f'{method} {url}'
+
+
+class SnapshotWriter:
+    """Дописывает ответы в снимок: pack-файл из сжатых zlib записей
+    (JSON-заголовок, перевод строки, тело) и индекс index.jsonl
+    со строками [ключ, смещение, длина]. Оба файла только дописываются,
+    поэтому снимок остается целым, даже если запуск оборвался."""
+
+    def __init__(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.pack = open(directory / SNAPSHOT_PACK_FILE, 'ab')
+        self.index = open(directory / SNAPSHOT_INDEX_FILE, 'a')
+        self.recorded = set()
+        self.lock = threading.Lock()
+
+    def hook(self, response, *args, **kwargs):
+        """Хук ответа сессии: записывает ответ, полученный из сети
+        или из кеша. Потоковые загрузки (Cache-Control: no-store)
+        не записываются, чтобы не читать архивы в память. Ответы 304
+        и 1xx пропускаются: при проверке устаревшей записи кеша хук
+        вызывается и для 304 без тела, и для ответа из кеша после нее."""
+        request = response.request
+        key = snapshot_key(request.method, response.url)
+        if (
+            request.headers.get('Cache-Control') == 'no-store'
+            or response.status_code == 304 or response.status_code < 200
+            or key in self.recorded
+        ):
+            return response
+        header = json.dumps({
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+        }).encode()
+        record = zlib.compress(header + b'\n' + response.content)
+        with self.lock:
+            if key in self.recorded:
+                return response
+            offset = self.pack.tell()
+            self.pack.write(record)
+            self.pack.flush()
+            self.index.write(json.dumps([key, offset, len(record)]) + '\n')
+            self.index.flush()
+            self.recorded.add(key)
+        return response
+
+
+class SnapshotReader:
+    """Читает записи снимка: индекс целиком в памяти, поиск O(1)."""
+
+    def __init__(self, directory):
+        self.positions = {}
+        with open(directory / SNAPSHOT_INDEX_FILE) as index:
+            for line in index:
+                key, offset, length = json.loads(line)
+                self.positions[key] = offset, length
+        self.pack = open(directory / SNAPSHOT_PACK_FILE, 'rb')
+        self.lock = threading.Lock()
+
+    def get(self, method, url):
+        """Возвращает (заголовок, тело) записи или None."""
+        position = self.positions.get(snapshot_key(method, url))
+        if position is None:
+            return None
+        offset, length = position
+        with self.lock:
+            self.pack.seek(offset)
+            record = zlib.decompress(self.pack.read(length))
+        header, _, body = record.partition(b'\n')
+        return json.loads(header), body
+
+
+class ReplayAdapter(BaseAdapter):
+    """Транспорт сессии, отвечающий из снимка без обращения к сети.
+    На запросы, которых нет в снимке, отвечает 404."""
+
+    offline = True
+
+    def __init__(self, reader):
+        super().__init__()
+        self.reader = reader
+
+    def send(self, request, **kwargs):
+        record = self.reader.get(request.method, request.url)
+        if record is None:
+            return build_response(
+                request, 404, INFO_NOT_IN_SNAPSHOT, {}, b''
+            )
+        header, body = record
+        return build_response(
+            request, header['status'], header['reason'], header['headers'],
+            body
+        )
+
+    def close(self):
+        pass
+
+
+def mount_snapshots(session, cli_args=None):
+    """Включает запись (--record) или воспроизведение (--replay) снимка.
+    При воспроизведении кеш отключается, чтобы все ответы брались
+    из снимка."""
+    if getattr(cli_args, 'replay', None):
+        session.settings.disabled = True
+        adapter = ReplayAdapter(SnapshotReader(cli_args.replay))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    if getattr(cli_args, 'record', None):
+        session.hooks['response'].append(SnapshotWriter(cli_args.record).hook)
+    return session
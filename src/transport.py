@@ -0,0 +1,158 @@
+import random
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import RequestHistory, Retry
+
+from constants import (BACKOFF_FACTOR, CONNECT_TIMEOUT, POOL_SIZE,
+                       RATE_BURST, RATE_LIMIT, RATE_LIMIT_MAX, READ_TIMEOUT,
+                       RETRIES, RETRY_STATUSES)
+from rate_limiter import RateLimiter
+
+
+class JitterRetry(Retry):
+    """Повторы с экспоненциальной задержкой и случайным разбросом
+    (full jitter), чтобы параллельные потоки не повторяли запросы разом.
+    Сообщает планировщику о каждой неудачной попытке и перед повтором
+    ждет разрешения планировщика."""
+
+    def __init__(self, *args, rate_limiter=None, host=None, **kwargs):
+        self.rate_limiter = rate_limiter
+        self.host = host
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.rate_limiter = self.rate_limiter
+        retry.host = kwargs.get('host', self.host)
+        return retry
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        host = _pool.host if _pool is not None else self.host
+        if self.rate_limiter is not None and host:
+            self.rate_limiter.feedback(
+                host,
+                response.status if response is not None else None,
+                response.headers.get('Retry-After')
+                if response is not None else None
+            )
+        retry = super().increment(
+            method, url, response, error, _pool, _stacktrace
+        )
+        retry.host = host
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.rate_limiter is not None and self.host:
+            self.rate_limiter.wait(self.host)
+
+
+class TransportAdapter(HTTPAdapter):
+    """HTTPAdapter с таймаутом по умолчанию для каждого запроса
+    и планировщиком запросов к каждому хосту."""
+
+    def __init__(self, timeout=None, rate_limiter=None, **kwargs):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.pool_size = kwargs.get('pool_maxsize', POOL_SIZE)
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if self.rate_limiter is None:
+            return super().send(
+                request, timeout=timeout or self.timeout, **kwargs
+            )
+        host = urlsplit(request.url).hostname
+        self.rate_limiter.wait(host)
+        response = super().send(
+            request, timeout=timeout or self.timeout, **kwargs
+        )
+        if response.status_code not in RETRY_STATUSES:
+            self.rate_limiter.feedback(host, response.status_code)
+        return response
+
+
+def mount_transport(session, cli_args=None):
+    """Настраивает пул соединений, таймауты, повторы и темп запросов сессии.
+    """
+    retries = getattr(cli_args, 'retries', RETRIES)
+    pool_size = getattr(cli_args, 'pool_size', POOL_SIZE)
+    rate = getattr(cli_args, 'rate', RATE_LIMIT)
+    rate_limiter = RateLimiter(
+        rate,
+        getattr(cli_args, 'burst', RATE_BURST),
+        getattr(cli_args, 'max_rate', RATE_LIMIT_MAX),
+    ) if rate else None
+    adapter = TransportAdapter(
+        timeout=(
+            getattr(cli_args, 'connect_timeout', CONNECT_TIMEOUT),
+            getattr(cli_args, 'read_timeout', READ_TIMEOUT),
+        ),
+        rate_limiter=rate_limiter,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=JitterRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=getattr(cli_args, 'backoff', BACKOFF_FACTOR),
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+            rate_limiter=rate_limiter,
+        ),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if getattr(cli_args, 'no_keep_alive', False):
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def get_timeout(session, url):
+    """Таймауты (connect, read), с которыми сессия ходит по адресу."""
+    return getattr(
+        session.get_adapter(url), 'timeout', (CONNECT_TIMEOUT, READ_TIMEOUT)
+    )
+
+
+def get_rate_limiter(session, url):
+    """Планировщик запросов, через который сессия ходит по адресу."""
+    return getattr(session.get_adapter(url), 'rate_limiter', None)
+
+
+def get_pool_size(session, url):
+    """Размер пула соединений (--pool-size), с которым сессия ходит
+    по адресу."""
+    return getattr(session.get_adapter(url), 'pool_size', POOL_SIZE)
+
+
+def keep_alive(session):
+    """Держит ли сессия соединения открытыми (нет --no-keep-alive)."""
+    return session.headers.get('Connection') != 'close'
+
+
+def get_retry(session, url):
+    """Политика повторов (--retries, --backoff), с которой сессия ходит
+    по адресу."""
+    return getattr(session.get_adapter(url), 'max_retries', None)
+
+
+def next_retry(retry, url, status=None, error=None):
+    """Следующая попытка по политике повторов сессии для запросов
+    не через urllib3 (движок async): политика с учтенной неудачной
+    попыткой, чья get_backoff_time() дает задержку перед повтором,
+    или None, если повторы исчерпаны или не настроены."""
+    if not isinstance(retry, Retry) or not retry.total:
+        return None
+    return retry.new(
+        total=retry.total - 1,
+        history=retry.history + (
+            RequestHistory('GET', url, error, status, None),
+        ),
+    )
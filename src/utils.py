@@ -1,18 +1,59 @@
-from bs4 import BeautifulSoup
-from requests import RequestException
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
 
-from constants import INFO_TAG_ERROR, INFO_URL_UNAVAILABLE
+from requests import RequestException, Response
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+from constants import INFO_TAG_ERROR, INFO_URL_UNAVAILABLE, STAGE_FETCH
 from exceptions import ParserFindTagException
+from metrics import metrics, observe_response, timed_call
 
 
-def get_response(session, url, charset='utf-8'):
-    """Реализует перехват ошибки соединения и записывает ее в логи."""
+def get_response(session, url, charset='utf-8', **kwargs):
+    """Реализует перехват ошибки соединения и записывает ее в логи.
+    Учитывает время загрузки, размер и попадание в кеш в метриках.
+    kwargs передаются в session.get."""
+    started = time.perf_counter()
     try:
-        response = session.get(url)
-        response.encoding = charset
-        return response
-    except RequestException:
-        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url))
+        response = session.get(url, **kwargs)
+    except RequestException as error:
+        metrics.observe(
+            STAGE_FETCH, time.perf_counter() - started, error=True
+        )
+        raise ConnectionError(INFO_URL_UNAVAILABLE.format(url, error))
+    observe_response(response, time.perf_counter() - started)
+    response.encoding = charset
+    return response
+
+
+def build_response(request, status, reason, headers, content, elapsed=None):
+    """Собирает requests.Response из готовых частей ответа (ответа aiohttp
+    или записи снимка), чтобы его можно было сохранить в кеш сессии."""
+    response = Response()
+    response.request = request
+    response.url = request.url
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response._content_consumed = True
+    if elapsed is not None:
+        response.elapsed = elapsed
+    response.raw = HTTPResponse(
+        body=io.BytesIO(content),
+        headers=headers,
+        status=status,
+        reason=reason,
+        preload_content=False,
+        request_url=request.url,
+    )
+    return response
 
 
 def find_tag(soup, tag, attrs=None):
@@ -23,6 +64,97 @@ def find_tag(soup, tag, attrs=None):
     return searched_tag
 
 
-def get_soup(session, url, parse_settings='lxml'):
-    """Готовит суп"""
-    return BeautifulSoup(get_response(session, url).text, parse_settings)
+def get_pages(session, urls, workers=1):
+    """Загружает страницы в пуле из workers потоков.
+    Возвращает кортежи (ссылка, текст, ошибка) в порядке исходного списка.
+    Загружено, но не отдано не больше 2 * workers страниц: следующая
+    ссылка отправляется в пул, только когда потребитель забрал страницу."""
+    def fetch(url):
+        try:
+            return url, get_response(session, url).text, None
+        except ConnectionError as error:
+            return url, None, error
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        waiting = iter(urls)
+        pending = deque(
+            executor.submit(fetch, url)
+            for url in islice(waiting, 2 * workers)
+        )
+        while pending:
+            page = pending.popleft().result()
+            for url in islice(waiting, 1):
+                pending.append(executor.submit(fetch, url))
+            yield page
+
+
+def extract_text(extractor, text):
+    """Разбирает текст страницы функцией extractor.
+    Время разбора учитывается в метриках этапа с именем extractor."""
+    record, seconds = timed_call(extractor, text)
+    metrics.observe(getattr(extractor, 'func', extractor).__name__, seconds)
+    return record
+
+
+def extract_page(session, url, extractor):
+    """Загружает страницу и разбирает ее функцией extractor."""
+    return extract_text(extractor, get_response(session, url).text)
+
+
+def extract_pages(extractor, pages, processes=0):
+    """Разбирает загруженные страницы функцией extractor.
+    При processes > 0 разбор идет в пуле процессов параллельно с загрузкой,
+    а в основной процесс возвращаются только извлеченные записи.
+    Время разбора учитывается в метриках этапа с именем extractor.
+    В пуле ждут разбора не больше 2 * processes страниц: пока очередь
+    полна, новые страницы не берутся из pages.
+    Возвращает кортежи (ссылка, запись, ошибка) в исходном порядке."""
+    stage = getattr(extractor, 'func', extractor).__name__
+
+    def result(timed):
+        if timed is None:
+            return None
+        record, seconds = timed
+        metrics.observe(stage, seconds)
+        return record
+
+    if not processes:
+        for url, text, error in pages:
+            yield url, result(
+                None if error else timed_call(extractor, text)
+            ), error
+        return
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for url, text, error in pages:
+            pending.append(
+                (url, None if error else executor.submit(
+                    timed_call, extractor, text
+                ), error)
+            )
+            while pending and (
+                pending[0][1] is None or pending[0][1].done()
+                or len(pending) >= 2 * processes
+            ):
+                url, future, error = pending.popleft()
+                yield url, result(future and future.result()), error
+        for url, future, error in pending:
+            yield url, result(future and future.result()), error
+
+
+def read_json(path, default=None):
+    """Читает JSON-файл; если файла нет или он испорчен - default."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def write_json(path, data):
+    """Атомарно записывает JSON-файл: сначала во временный, затем замена."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,142 @@
+import datetime as dt
+import hashlib
+import json
+import logging
+import sys
+import time
+from functools import partial
+
+from cache_utils import limit_cache
+from constants import (BASE_DIR, CACHE_MAX_SIZE, INFO_COMMAND_PARAMS,
+                       INFO_ERROR, INFO_WATCH_BASELINE, INFO_WATCH_CHANGES,
+                       INFO_WATCH_STOPPED, MAIN_DOC_URL, MEGABYTE,
+                       PARSE_PARTIAL, PEPS_URL, STATE_DIR, WATCH_INTERVAL,
+                       WATCH_POLLS, WATCH_STATE_FILE)
+from parsers import extract_latest_versions, extract_pep_index, version_status
+from utils import extract_text, get_response, read_json, write_json
+
+
+def versions_items(a_tags):
+    """Состояние боковой панели версий: {версия: статус}."""
+    return dict(version_status(text) for _, text in a_tags)
+
+
+def pep_items(pep_rows):
+    """Состояние индекса PEP: {номер: статус в таблице}."""
+    return {number: status for number, _, status in pep_rows}
+
+
+# Что наблюдаем: страница, функция разбора и приведение записей
+# к словарю {ключ: значение}, который сравнивается между опросами.
+WATCH_TARGETS = {
+    'latest-versions': (MAIN_DOC_URL, extract_latest_versions, versions_items),
+    'pep': (PEPS_URL, extract_pep_index, pep_items),
+}
+
+
+def diff_items(old, new):
+    """События изменений между двумя состояниями {ключ: значение}."""
+    events = []
+    for key in sorted(old.keys() | new.keys()):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        change = (
+            'added' if key not in old
+            else 'removed' if key not in new else 'changed'
+        )
+        events.append(
+            {'key': key, 'change': change, 'old': before, 'new': after}
+        )
+    return events
+
+
+def poll_target(session, name, target, state, cli_args=None):
+    """Опрашивает страницу условным запросом (ETag/Last-Modified из кеша).
+    Страница разбирается заново, только если изменилось тело ответа.
+    Обновляет state[name] и возвращает события изменений."""
+    url, extractor, to_items = target
+    # refresh: у CachedSession - запрос с If-None-Match/If-Modified-Since
+    # даже для свежего ответа в кеше; 304 возвращает тело из кеша.
+    refresh = {'refresh': True} if hasattr(session, 'cache') else {}
+    response = get_response(session, url, **refresh)
+    digest = hashlib.sha1(response.content).hexdigest()
+    previous = state.get(name)
+    if previous is not None and previous['digest'] == digest:
+        return []
+    items = to_items(extract_text(
+        partial(extractor, parse=getattr(cli_args, 'parse', PARSE_PARTIAL)),
+        response.text
+    ))
+    state[name] = {'digest': digest, 'items': items}
+    if previous is None:
+        logging.info(INFO_WATCH_BASELINE.format(name, len(items)))
+        return []
+    events = diff_items(previous['items'], items)
+    if events:
+        logging.info(INFO_WATCH_CHANGES.format(name, len(events)))
+    now = dt.datetime.now().isoformat(timespec='seconds')
+    return [
+        {'time': now, 'target': name, 'url': url, **event}
+        for event in events
+    ]
+
+
+def emit_events(events, events_path=None, stream=None):
+    """Выводит события строками JSON в stdout и дописывает в events_path."""
+    lines = [json.dumps(event, ensure_ascii=False) for event in events]
+    if not lines:
+        return
+    print(*lines, sep='\n', file=stream or sys.stdout, flush=True)
+    if events_path is not None:
+        with open(events_path, 'a', encoding='utf-8') as file:
+            file.writelines(line + '\n' for line in lines)
+
+
+def watch_targets(cli_args=None):
+    """Цели наблюдения из параметров команды (по умолчанию - все)."""
+    names = getattr(cli_args, 'params', None) or list(WATCH_TARGETS)
+    unknown = [name for name in names if name not in WATCH_TARGETS]
+    if unknown:
+        raise ValueError(INFO_COMMAND_PARAMS.format('watch', unknown))
+    return {name: WATCH_TARGETS[name] for name in names}
+
+
+def run_watch(session, cli_args=None, targets=None, sleep=time.sleep):
+    """Опрашивает цели каждые --interval секунд одной сессией.
+    Ошибка опроса записывается в лог и не останавливает наблюдение.
+    Состояние хранится в state/watch.json и переживает перезапуск.
+    Возвращает количество выполненных опросов."""
+    targets = targets or watch_targets(cli_args)
+    interval = getattr(cli_args, 'interval', WATCH_INTERVAL)
+    polls = getattr(cli_args, 'polls', WATCH_POLLS)
+    events_path = getattr(cli_args, 'events', None)
+    state_path = BASE_DIR / STATE_DIR / WATCH_STATE_FILE
+    state = read_json(state_path)
+    count = 0
+    try:
+        while True:
+            started = time.monotonic()
+            for name, target in targets.items():
+                try:
+                    events = poll_target(
+                        session, name, target, state, cli_args
+                    )
+                except Exception as error:
+                    logging.error(INFO_ERROR.format(error))
+                    continue
+                emit_events(events, events_path)
+            write_json(state_path, state)
+            limit_cache(
+                session,
+                getattr(cli_args, 'cache_max_size', CACHE_MAX_SIZE)
+                * MEGABYTE
+            )
+            count += 1
+            if polls and count >= polls:
+                break
+            sleep(max(interval - (time.monotonic() - started), 0))
+    except KeyboardInterrupt:
+        pass
+    logging.info(INFO_WATCH_STOPPED.format(count))
+    return count
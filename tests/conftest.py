@@ -1,5 +1,7 @@
 import pytest
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from bs4 import BeautifulSoup
 import requests_mock
@@ -87,6 +89,51 @@ def soup(response_page):
     return BeautifulSoup(response, features='lxml')
 
 
+PEPS_URL = 'https://peps.python.org/'
+PEP_CARDS = (
+    (1, 'A', 'Active'),
+    (8, 'A', 'Accepted'),
+    (20, '', 'Active'),
+    (42, 'F', 'Final'),
+    (666, 'R', 'Rejected'),
+    (3000, 'S', 'Final'),
+)
+
+
+def pep_index_page(cards=PEP_CARDS) -> str:
+    rows = ''.join(
+        f'<tr><td><abbr title="">P{status}</abbr></td>'
+        f'<td><a class="pep reference internal" href="pep-{number:04d}/">'
+        f'{number}</a></td></tr>'
+        for number, status, _ in cards
+    )
+    return (
+        '<html><body><section id="numerical-index"><table>'
+        f'<tr><th>Status</th><th>PEP</th></tr>{rows}'
+        '</table></section></body></html>'
+    )
+
+
+def pep_card_page(status: str) -> str:
+    return (
+        '<html><body><h1>PEP</h1><dl class="rfc2822 field-list simple">'
+        f'<dt>Author<span>:</span></dt><dd>Guido</dd>'
+        f'<dt>Status<span>:</span></dt>\n<dd>{status}</dd>'
+        '</dl></body></html>'
+    )
+
+
+@pytest.fixture
+def pep_mocker():
+    with requests_mock.Mocker() as mock:
+        mock.get(PEPS_URL, text=pep_index_page())
+        for number, _, status in PEP_CARDS:
+            mock.get(
+                f'{PEPS_URL}pep-{number:04d}/', text=pep_card_page(status)
+            )
+        yield mock
+
+
 @pytest.fixture
 def pep_namespace():
     return Namespace(mode='pep', clear_cache=False, output='file')
@@ -110,3 +157,81 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    pages = {}
+    hits = []
+    failures = {}
+
+    def send_page(self, with_body):
+        if self.failures.get(self.path):
+            self.failures[self.path] -= 1
+            self.send_error(503)
+            return
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{len(body)}-{hash(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        status, start, end = 200, 0, len(body) - 1
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') in (etag, None):
+            first, _, last = range_header[len('bytes='):].partition('-')
+            start, end = int(first), int(last or end)
+            status = 206
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(body)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(end + 1 - start))
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header(
+                'Content-Range', f'bytes {start}-{end}/{len(body)}'
+            )
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body[start:end + 1])
+
+    def do_GET(self):
+        self.hits.append((
+            self.path,
+            self.headers.get('Range') or self.headers.get('If-None-Match')
+        ))
+        self.send_page(with_body=True)
+
+    def do_HEAD(self):
+        self.send_page(with_body=False)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Локальный HTTP-сервер: словарь pages {путь: байты}, список hits,
+    failures {путь: сколько раз ответить 503}."""
+    handler = type(
+        'Handler', (LocalHandler,), {'pages': {}, 'hits': [], 'failures': {}}
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_port}/'
+    server.pages = handler.pages
+    server.hits = handler.hits
+    server.failures = handler.failures
+    yield server
+    server.shutdown()
+    server.server_close()
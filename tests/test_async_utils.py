@@ -0,0 +1,113 @@
+from argparse import Namespace
+
+from requests_cache import CachedSession
+try:
+    from src import async_utils, transport
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+
+
+def test_get_pages_async(local_server, tempfile_session):
+    for number in range(5):
+        local_server.pages[f'/pep-{number}/'] = (
+            f'<html><h1>PEP {number}</h1></html>'.encode()
+        )
+    urls = [f'{local_server.url}pep-{number}/' for number in range(5)]
+    urls.append('http://127.0.0.1:1/unreachable/')
+    got = list(async_utils.get_pages_async(tempfile_session, urls, workers=3))
+    assert [url for url, _, _ in got] == urls, (
+        'Функция `get_pages_async` должна сохранять порядок ссылок'
+    )
+    for number, (_, text, error) in enumerate(got[:-1]):
+        assert error is None
+        assert text == f'<html><h1>PEP {number}</h1></html>'
+    assert got[-1][1] is None and isinstance(got[-1][2], ConnectionError), (
+        'Недоступная страница должна возвращаться с ошибкой ConnectionError'
+    )
+
+
+def test_async_engine_shares_cache(local_server, tempfile_session):
+    local_server.pages['/index/'] = b'<html><h1>Index</h1></html>'
+    url = local_server.url + 'index/'
+    list(async_utils.get_pages_async(tempfile_session, [url, url]))
+    hits = len(local_server.hits)
+    list(async_utils.get_pages_async(tempfile_session, [url]))
+    response = tempfile_session.get(url)
+    assert response.from_cache, (
+        'Ответы асинхронного движка должны попадать в кеш сессии'
+    )
+    assert response.text == '<html><h1>Index</h1></html>'
+    assert len(local_server.hits) == hits, (
+        'Повторный запуск асинхронного движка должен читать кеш сессии'
+    )
+
+
+def test_async_engine_revalidates(local_server):
+    local_server.pages['/pep-0008/'] = b'<html><h1>PEP 8</h1></html>'
+    url = local_server.url + 'pep-0008/'
+    session = CachedSession(
+        backend='memory', urls_expire_after={'127.0.0.1': 0}
+    )
+    list(async_utils.get_pages_async(session, [url]))
+    got = list(async_utils.get_pages_async(session, [url]))
+    assert got[0][1] == '<html><h1>PEP 8</h1></html>'
+    assert local_server.hits[0][1] is None
+    assert local_server.hits[1][1] is not None, (
+        'Устаревшая страница должна перепроверяться по ETag'
+    )
+
+
+def test_get_pages_async_streams(local_server, tempfile_session):
+    for number in range(20):
+        local_server.pages[f'/pep-{number}/'] = b'<html></html>'
+    urls = [f'{local_server.url}pep-{number}/' for number in range(20)]
+    pages = async_utils.get_pages_async(tempfile_session, urls, workers=2)
+    assert next(pages) == (urls[0], '<html></html>', None)
+    assert len(local_server.hits) < len(urls), (
+        'Движок async должен отдавать страницы по мере загрузки, '
+        'не дожидаясь всего обхода'
+    )
+    pages.close()
+    hits = len(local_server.hits)
+    assert hits < len(urls), (
+        'После остановки потребителя загрузка должна прекращаться'
+    )
+
+
+def test_async_engine_retries(local_server, tempfile_session):
+    local_server.pages['/pep-0008/'] = b'PEP 8'
+    local_server.failures['/pep-0008/'] = 2
+    url = local_server.url + 'pep-0008/'
+    transport.mount_transport(
+        tempfile_session, Namespace(retries=3, backoff=0.01)
+    )
+    assert list(async_utils.get_pages_async(tempfile_session, [url])) == [
+        (url, 'PEP 8', None)
+    ], 'Ответы 5xx в движке async должны повторяться с задержкой'
+    assert len(local_server.hits) == 3
+
+    local_server.failures['/pep-0008/'] = 5
+    transport.mount_transport(
+        tempfile_session, Namespace(retries=1, backoff=0.01)
+    )
+    tempfile_session.cache.clear()
+    list(async_utils.get_pages_async(tempfile_session, [url]))
+    assert len(local_server.hits) == 5, (
+        'Движок async не должен делать больше попыток, чем --retries + 1'
+    )
+
+
+def test_async_engine_stale_if_error(local_server):
+    local_server.pages['/pep-0008/'] = b'<html><h1>PEP 8</h1></html>'
+    url = local_server.url + 'pep-0008/'
+    session = CachedSession(
+        backend='memory', expire_after=0, stale_if_error=True
+    )
+    list(async_utils.get_pages_async(session, [url]))
+    local_server.failures['/pep-0008/'] = 1
+    assert list(async_utils.get_pages_async(session, [url])) == [
+        (url, '<html><h1>PEP 8</h1></html>', None)
+    ], 'При ошибке сервера движок async должен отдавать ответ из кеша'
+    assert local_server.failures['/pep-0008/'] == 0
@@ -0,0 +1,65 @@
+from argparse import Namespace
+
+from requests import Request, Response
+
+try:
+    from src import cache_utils, configs
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache_utils.py`'
+
+
+def make_response(content_type, size):
+    response = Response()
+    response.headers['Content-Type'] = content_type
+    response._content = bytes(size)
+    return response
+
+
+def test_cacheable():
+    assert cache_utils.cacheable(make_response('text/html', 10 ** 7), 100)
+    assert not cache_utils.cacheable(
+        make_response('application/zip', 1000), 100
+    ), 'Большие двоичные ответы не должны кешироваться'
+    assert cache_utils.cacheable(make_response('application/zip', 1000), 0)
+
+
+def test_cacheable_stream():
+    class Unread:
+        def read(self, *args, **kwargs):
+            raise AssertionError('Тело потоковой загрузки не должно читаться')
+
+    response = Response()
+    response.headers['Content-Type'] = 'application/zip'
+    response.raw = Unread()
+    response.request = Request('GET', 'http://docs/a.zip').prepare()
+    assert not cache_utils.cacheable(response, 100), (
+        'Двоичный ответ без Content-Length не должен читаться фильтром'
+    )
+    response.request.headers['Cache-Control'] = 'no-store'
+    assert not cache_utils.cacheable(response, 0)
+
+
+def test_limit_cache_lru(monkeypatch, tmp_path, local_server):
+    monkeypatch.chdir(tmp_path)
+    session = configs.configure_session(Namespace(rate=0))
+    urls = []
+    for name in 'abc':
+        local_server.pages[f'/{name}.html'] = name.encode() * 10000
+        urls.append(local_server.url + f'{name}.html')
+    for url in [*urls, urls[0]]:
+        session.get(url)
+    session.cache.redirects['alias'] = session.cache.create_key(
+        Request('GET', urls[1]).prepare()
+    )
+    evicted, freed = cache_utils.limit_cache(session, 25000)
+    assert evicted == 1 and freed > 0
+    assert 'alias' not in session.cache.redirects, (
+        'Вместе с ответом должны удаляться перенаправления на него'
+    )
+    assert [session.cache.contains(url=url) for url in urls] == [
+        True, False, True
+    ], 'Вытесняться должен ответ, к которому дольше всего не обращались'
+    evicted, before, after = cache_utils.compact_cache(session, 0)
+    assert evicted == 0 and after <= before
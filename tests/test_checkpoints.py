@@ -0,0 +1,52 @@
+try:
+    from src import checkpoints
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoints.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoints.py`'
+
+
+def fetch_pages(requested):
+    def fetch(urls):
+        requested.extend(urls)
+        for url in urls:
+            error = 'timeout' if url == 'c' else None
+            yield url, None if error else url.upper(), error
+    return fetch
+
+
+def test_checkpoint_resume(tmp_path):
+    path = tmp_path / 'checkpoint.json'
+    requested = []
+    with checkpoints.Checkpoint(path) as checkpoint:
+        pages = checkpoints.resume_pages(
+            checkpoint, ['a', 'b', 'c', 'd'], fetch_pages(requested)
+        )
+        next(pages)
+        pages.close()
+    assert not path.exists(), (
+        'После успешного завершения контрольная точка удаляется'
+    )
+    try:
+        with checkpoints.Checkpoint(path) as checkpoint:
+            for url, record, error in checkpoints.resume_pages(
+                checkpoint, ['a', 'b', 'c', 'd'], fetch_pages(requested)
+            ):
+                if url == 'c':
+                    raise KeyboardInterrupt
+    except KeyboardInterrupt:
+        pass
+    assert path.exists(), 'При прерывании контрольная точка сохраняется'
+
+    requested.clear()
+    with checkpoints.Checkpoint(path, resume=True) as checkpoint:
+        got = list(checkpoints.resume_pages(
+            checkpoint, ['a', 'b', 'c', 'd'], fetch_pages(requested)
+        ))
+    assert requested == ['c', 'd'], (
+        'Загружаются только страницы, которых нет в контрольной точке'
+    )
+    assert got == [
+        ('a', 'A', None), ('b', 'B', None), ('c', None, 'timeout'),
+        ('d', 'D', None),
+    ], 'Результаты отдаются в исходном порядке ссылок'
@@ -1,5 +1,7 @@
 import pytest
 import argparse
+import logging
+import queue
 try:
     from src import configs
 except ModuleNotFoundError:
@@ -29,7 +31,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'sqlite'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +66,59 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_expire_rule():
+    pattern, expire_after = configs.expire_rule('peps.python.org/pep-=3600')
+    assert pattern == 'peps.python.org/pep-'
+    assert expire_after.total_seconds() == 3600
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.expire_rule('peps.python.org')
+
+
+@pytest.mark.parametrize('value', ['0/4', '5/4', '1', 'a/b', '1/0'])
+def test_shard_rule(value):
+    assert configs.shard_rule('2/4') == (2, 4)
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.shard_rule(value)
+
+
+def test_configure_session(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--expire', 'peps.python.org/pep-=60']
+    )
+    session = configs.configure_session(args)
+    rules = session.settings.urls_expire_after
+    assert list(rules)[0] == 'peps.python.org/pep-', (
+        'Правила из командной строки должны идти раньше правил по умолчанию'
+    )
+    assert rules['peps.python.org/pep-'].total_seconds() == 60
+    assert 'docs.python.org' in rules
+
+
+def test_configure_logging(monkeypatch, tmp_path):
+    monkeypatch.setattr(configs, 'LOG_DIR', tmp_path)
+    monkeypatch.setattr(configs, 'LOG_FILE', tmp_path / 'parser.log')
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    stops = []
+    monkeypatch.setattr(configs.atexit, 'register', stops.append)
+    configs.configure_logging()
+    assert [type(handler) for handler in root.handlers] == [
+        configs.DroppingQueueHandler
+    ], 'Записи должны попадать в очередь, а не сразу в файл и терминал'
+    logging.info('Проверка очереди логов')
+    stops[0]()
+    assert '[INFO] - Проверка очереди логов"' in (
+        tmp_path / 'parser.log'
+    ).read_text(encoding='utf-8'), 'Запись должна оформляться один раз'
+
+
+def test_dropping_queue_handler():
+    handler = configs.DroppingQueueHandler(queue.Queue(1))
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({'msg': 'запись'}))
+    assert handler.dropped == 2, (
+        'При переполненной очереди записи должны отбрасываться без ожидания'
+    )
@@ -0,0 +1,133 @@
+try:
+    from src import download_utils, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `download_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `download_utils.py`'
+
+ARCHIVE = bytes(range(256)) * 1000
+
+
+def test_stream_download(local_server, tempfile_session, tmp_path):
+    local_server.pages['/docs.zip'] = ARCHIVE
+    url = local_server.url + 'docs.zip'
+    path = tmp_path / 'docs.zip'
+    download_utils.stream_download(
+        tempfile_session, url, path, chunk_size=1024
+    )
+    assert path.read_bytes() == ARCHIVE
+    assert len(local_server.hits) == 1
+    assert not list(tempfile_session.cache.responses.keys()), (
+        'Архив не должен попадать в кеш сессии'
+    )
+
+
+def test_stream_download_resume(local_server, tempfile_session, tmp_path):
+    local_server.pages['/docs.zip'] = ARCHIVE
+    url = local_server.url + 'docs.zip'
+    path = tmp_path / 'docs.zip'
+    validators = download_utils.get_validators(tempfile_session, url)
+    (tmp_path / 'docs.zip.part').write_bytes(ARCHIVE[:1000])
+    utils.write_json(
+        tmp_path / 'docs.zip.meta.json',
+        {'validators': validators, 'complete': False}
+    )
+    download_utils.stream_download(tempfile_session, url, path)
+    assert local_server.hits == [('/docs.zip', 'bytes=1000-')], (
+        'Прерванная загрузка должна продолжаться запросом с Range'
+    )
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_stream_download_complete_part(local_server, tempfile_session,
+                                       tmp_path):
+    local_server.pages['/docs.zip'] = ARCHIVE
+    url = local_server.url + 'docs.zip'
+    path = tmp_path / 'docs.zip'
+    validators = download_utils.get_validators(tempfile_session, url)
+    (tmp_path / 'docs.zip.part').write_bytes(ARCHIVE)
+    utils.write_json(
+        tmp_path / 'docs.zip.meta.json', {'validators': validators}
+    )
+    download_utils.stream_download(tempfile_session, url, path)
+    assert path.read_bytes() == ARCHIVE, (
+        'Полностью загруженный .part должен становиться файлом архива, '
+        'а не приводить к ошибке 416'
+    )
+    assert not (tmp_path / 'docs.zip.part').exists()
+
+
+def test_archive_format():
+    assert download_utils.archive_format(
+        'archives/python-3.12.1-docs-pdf-a4.tar.bz2'
+    ) == 'pdf-a4.tar.bz2'
+    assert download_utils.archive_format(
+        'https://docs.python.org/3/archives/python-3.12.1-docs.epub'
+    ) == 'epub'
+
+
+def test_download_archives(monkeypatch, local_server, tempfile_session,
+                           tmp_path):
+    monkeypatch.setattr(download_utils, 'SEGMENT_MIN_SIZE', 1000)
+    local_server.pages['/docs-html.zip'] = ARCHIVE
+    local_server.pages['/docs-text.zip'] = ARCHIVE[:500]
+    urls = [
+        local_server.url + 'docs-html.zip', local_server.url + 'docs-text.zip'
+    ]
+    heads = []
+    head = tempfile_session.head
+    tempfile_session.head = (
+        lambda url, **kwargs: heads.append(url) or head(url, **kwargs)
+    )
+    got = list(download_utils.download_archives(
+        tempfile_session, urls, tmp_path, workers=2, segments=4, pool_size=2
+    ))
+    assert sorted(heads) == urls, (
+        'Для каждого архива должен быть ровно один запрос HEAD'
+    )
+    assert [(path.name, downloaded, error) for _, path, downloaded, error
+            in got] == [
+        ('docs-html.zip', True, None), ('docs-text.zip', True, None)
+    ]
+    assert (tmp_path / 'docs-html.zip').read_bytes() == ARCHIVE
+    assert (tmp_path / 'docs-text.zip').read_bytes() == ARCHIVE[:500]
+    assert {
+        byte_range for path, byte_range in local_server.hits
+        if path == '/docs-html.zip'
+    } == {
+        'bytes=0-63999', 'bytes=64000-127999', 'bytes=128000-191999',
+        'bytes=192000-255999',
+    }, 'Большой архив должен загружаться параллельными частями по Range'
+    manifest = utils.read_json(tmp_path / 'manifest.json')
+    assert manifest['docs-text.zip']['size'] == 500, (
+        'Манифест должен хранить размер и контрольную сумму каждого архива'
+    )
+
+    hits = len(local_server.hits)
+    local_server.pages['/docs-text.zip'] = ARCHIVE[:600]
+    got = list(download_utils.download_archives(
+        tempfile_session, urls, tmp_path, workers=2, segments=4
+    ))
+    assert [downloaded for _, _, downloaded, _ in got] == [False, True], (
+        'Неизменившийся архив не должен загружаться повторно'
+    )
+    assert local_server.hits[hits:] == [('/docs-text.zip', None)]
+    assert (tmp_path / 'docs-text.zip').read_bytes() == ARCHIVE[:600]
+
+
+def test_download_archives_corrupted(local_server, tempfile_session,
+                                     tmp_path):
+    local_server.pages['/docs.zip'] = ARCHIVE
+    urls = [local_server.url + 'docs.zip']
+    list(download_utils.download_archives(tempfile_session, urls, tmp_path))
+    (tmp_path / 'docs.zip').write_bytes(b'corrupt')
+    got = list(
+        download_utils.download_archives(tempfile_session, urls, tmp_path)
+    )
+    assert [downloaded for _, _, downloaded, _ in got] == [True]
+    assert (tmp_path / 'docs.zip').read_bytes() == ARCHIVE, (
+        'Архив с неверной контрольной суммой должен загружаться заново'
+    )
+    assert utils.read_json(tmp_path / 'manifest.json')['docs.zip'][
+        'sha256'
+    ] == download_utils.file_sha256(tmp_path / 'docs.zip')
@@ -1,4 +1,10 @@
+import inspect
+import sys
 import pytest
+import requests
+import requests_mock
+from argparse import Namespace
+from conftest import PEP_CARDS, PEPS_URL, pep_card_page, pep_index_page
 from pathlib import Path
 try:
     from src import main
@@ -33,9 +39,10 @@ def test_main_file():
 def test_whats_new(mock_session):
     got = main.whats_new(mock_session)
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
+    assert inspect.isgenerator(got), (
+        'Функция `whats_new` должна отдавать строки генератором'
     )
+    got = list(got)
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -54,9 +61,10 @@ def test_whats_new(mock_session):
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
     got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
+    assert inspect.isgenerator(got), (
+        'Функция `latest_versions` должна отдавать строки генератором'
     )
+    got = list(got)
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -112,6 +120,55 @@ def test_download(monkeypatch, tmp_path, mock_session):
     )
 
 
+@pytest.mark.parametrize('workers, processes, parse', [
+    (1, 0, 'full'),
+    (4, 0, 'partial'),
+    (4, 2, 'xpath'),
+])
+def test_pep(
+    monkeypatch, tmp_path, pep_mocker, mock_session, workers, processes, parse
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    got = main.pep(
+        mock_session,
+        Namespace(workers=workers, processes=processes, parse=parse)
+    )
+    assert got == [
+        ('Status', 'Quantities'),
+        ('Active', 2),
+        ('Accepted', 1),
+        ('Final', 2),
+        ('Rejected', 1),
+        ('Total', 6),
+    ], (
+        'Функция `pep` должна возвращать одинаковые итоги '
+        f'при загрузке страниц в {workers} потоков '
+        f'и разборе в {processes} процессах'
+    )
+
+
+def test_pep_incremental(monkeypatch, tmp_path, pep_mocker, mock_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    first = main.pep(mock_session, Namespace(incremental=True))
+    assert pep_mocker.call_count == 7
+    cards = [*PEP_CARDS[:-1], (3000, 'F', 'Final'), (3001, '', 'Draft')]
+    pep_mocker.get(PEPS_URL, text=pep_index_page(cards))
+    pep_mocker.get(f'{PEPS_URL}pep-3001/', text=pep_card_page('Draft'))
+    mock_session.cache.clear()
+    got = main.pep(mock_session, Namespace(incremental=True))
+    fetched = [request.url for request in pep_mocker.request_history[7:]]
+    assert sorted(fetched) == [
+        PEPS_URL, f'{PEPS_URL}pep-3000/', f'{PEPS_URL}pep-3001/'
+    ], (
+        'В режиме --incremental должны загружаться только новые PEP '
+        'и PEP с изменившимся статусом в индексе'
+    )
+    assert first[-1] == ('Total', 6)
+    assert got[-1] == ('Total', 7), (
+        'Итоги в режиме --incremental считаются по всем PEP'
+    )
+
+
 def test_mode_to_function():
     got = main.MODE_TO_FUNCTION
     assert isinstance(got, dict), (
@@ -140,3 +197,142 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_run_all(monkeypatch, tmp_path, caplog, pep_mocker, mock_session):
+    # main импортирует outputs как модуль верхнего уровня из src.
+    monkeypatch.setattr(sys.modules['outputs'], 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    pep_mocker.get(main.MAIN_DOC_URL, text=(
+        '<div class="sphinxsidebarwrapper"><ul>'
+        '<li><a href="/3.13/">Python 3.13 (stable)</a></li>'
+        '<li><a href="/versions/">All versions</a></li></ul></div>'
+    ))
+    pep_mocker.get(
+        main.urljoin(main.MAIN_DOC_URL, 'whatsnew/'),
+        exc=requests.exceptions.ConnectTimeout
+    )
+    main.run_all(mock_session, Namespace(
+        mode='all', params=['pep', 'latest-versions', 'whats-new'],
+        output='file', cache_max_size=0
+    ))
+    saved = sorted(
+        path.name.split('_')[0] for path in tmp_path.glob('results/*.csv')
+    )
+    assert saved == ['latest-versions', 'pep'], (
+        'Команда `all` должна сохранять результаты каждого режима отдельно'
+    )
+    assert 'whats-new' in caplog.text, (
+        'Ошибка одного режима должна попадать в лог, не мешая остальным'
+    )
+
+
+def test_run_all_unknown_mode(mock_session):
+    with pytest.raises(ValueError):
+        main.run_all(mock_session, Namespace(params=['all']))
+
+
+def test_pep_shards_merge(monkeypatch, tmp_path, pep_mocker, mock_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    full = main.pep(mock_session)
+    shards = [
+        main.pep(mock_session, Namespace(shard=(index, 3)))
+        for index in (1, 2, 3)
+    ]
+    assert sum(shard[-1][1] for shard in shards) == full[-1][1], (
+        'Шарды должны делить индекс PEP без пересечений и пропусков'
+    )
+    merged = []
+    monkeypatch.setattr(
+        main, 'control_output', lambda results, cli_args: merged.append(
+            (results, cli_args.mode)
+        )
+    )
+    main.merge(mock_session, Namespace(mode='merge', params=[]))
+    assert merged == [(full, 'pep')], (
+        'Команда `merge` должна собирать ту же итоговую таблицу, что и `pep`'
+    )
+    (tmp_path / 'results' / 'pep_shard_2_of_3.json').unlink()
+    with pytest.raises(ValueError):
+        main.merge(mock_session, Namespace(mode='merge', params=[]))
+
+
+def test_pep_resume(monkeypatch, tmp_path, pep_mocker, mock_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    broken_url = f'{PEPS_URL}pep-0042/'
+    pep_mocker.get(broken_url, text='<html><h1>PEP 42</h1></html>')
+    with pytest.raises(Exception):
+        main.pep(mock_session)
+    checkpoint = tmp_path / 'state' / 'checkpoint_pep.json'
+    assert checkpoint.exists(), (
+        'При сбое обхода должна сохраняться контрольная точка'
+    )
+    pep_mocker.get(broken_url, text=pep_card_page('Final'))
+    mock_session.cache.clear()
+    calls = pep_mocker.call_count
+    got = main.pep(mock_session, Namespace(resume=True))
+    fetched = [request.url for request in pep_mocker.request_history[calls:]]
+    assert fetched == [
+        PEPS_URL, broken_url, f'{PEPS_URL}pep-0666/', f'{PEPS_URL}pep-3000/'
+    ], 'С --resume должны загружаться только необработанные карточки'
+    assert got[-1] == ('Total', 6), (
+        'Итоги с --resume должны учитывать карточки из контрольной точки'
+    )
+    assert not checkpoint.exists(), (
+        'После успешного обхода контрольная точка должна удаляться'
+    )
+
+
+def test_download_formats(monkeypatch, tmp_path, caplog, mock_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    caplog.set_level('INFO')
+    archives = f'{main.MAIN_DOC_URL}archives/'
+    with requests_mock.Mocker() as mock:
+        mock.get(f'{main.MAIN_DOC_URL}download.html', text=(
+            '<table class="docutils"><tr>'
+            '<td><a href="archives/python-docs-pdf-a4.zip">A4</a></td>'
+            '<td><a href="archives/python-docs-text.zip">Text</a></td>'
+            '<td><a href="archives/python-docs.epub">EPUB</a></td>'
+            '</tr></table>'
+        ))
+        for name in ('python-docs-text.zip', 'python-docs.epub'):
+            mock.head(archives + name, headers={'ETag': name})
+            mock.get(archives + name, content=name.encode())
+        main.download(mock_session, Namespace(
+            formats=['epub', 'text.zip', 'html.zip'], segments=4
+        ))
+    saved = sorted(
+        path.name for path in (tmp_path / 'downloads').glob('python-*')
+        if not path.name.endswith('.meta.json')
+    )
+    assert saved == ['python-docs-text.zip', 'python-docs.epub'], (
+        'Должны загружаться только архивы выбранных форматов'
+    )
+    assert 'html.zip' in caplog.text, (
+        'Форматы, которых нет на странице загрузки, должны попадать в лог'
+    )
+
+
+def test_index_search(monkeypatch, tmp_path, mock_session):
+    import zipfile
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    (tmp_path / 'downloads').mkdir()
+    with zipfile.ZipFile(
+        tmp_path / 'downloads' / 'python-3.12-docs-text.zip', 'w'
+    ) as archive:
+        archive.writestr('docs/library/os.txt', 'os\nos.path.join()')
+    (tmp_path / 'downloads' / 'python-3.12-docs-pdf-a4.zip').write_bytes(b'')
+    main.index_docs(mock_session, Namespace(params=[]))
+    found = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: found.extend(results)
+    )
+    main.search_docs(
+        mock_session, Namespace(mode='search', params=['join'], limit=5)
+    )
+    assert [row[:2] for row in found[1:]] == [
+        ('text.zip', 'library/os.txt')
+    ], 'Команда `search` должна находить документы из архивов в downloads'
+    with pytest.raises(ValueError):
+        main.search_docs(mock_session, Namespace(mode='search', params=[]))
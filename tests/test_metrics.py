@@ -0,0 +1,43 @@
+import json
+
+try:
+    from src import metrics, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+def extract_length(html):
+    return len(html)
+
+
+def test_stage_metrics(local_server, tempfile_session):
+    local_server.pages['/index.html'] = b'<h1>Python</h1>'
+    url = local_server.url + 'index.html'
+    utils.metrics.reset()
+    utils.get_response(tempfile_session, url)
+    pages = utils.get_pages(tempfile_session, [url])
+    assert list(utils.extract_pages(extract_length, pages)) == [
+        (url, 15, None)
+    ]
+    stages = utils.metrics.snapshot()
+    assert stages['fetch']['calls'] == 2
+    assert stages['fetch']['bytes'] == 30
+    assert (stages['fetch']['cache_misses'], stages['fetch']['cache_hits']) \
+        == (1, 1), 'Повторная загрузка страницы должна браться из кеша'
+    assert stages['extract_length']['calls'] == 1, (
+        'Разбор страниц должен учитываться под именем функции разбора'
+    )
+
+
+def test_export_metrics(tmp_path):
+    stages = {'fetch': dict.fromkeys(metrics.FIELDS, 1)}
+    metrics.export_metrics(tmp_path / 'parser.prom', 'pep', stages)
+    text = (tmp_path / 'parser.prom').read_text(encoding='utf-8')
+    assert 'parser_stage_calls{mode="pep",stage="fetch"} 1' in text
+    assert '# TYPE parser_stage_seconds gauge' in text
+    metrics.export_metrics(tmp_path / 'metrics.json', 'pep', stages)
+    assert json.loads(
+        (tmp_path / 'metrics.json').read_text(encoding='utf-8')
+    ) == {'mode': 'pep', 'stages': stages}
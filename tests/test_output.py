@@ -1,3 +1,4 @@
+import sqlite3
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +91,60 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_streaming(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+
+    def rows():
+        yield 'Status', 'Quantities'
+        for number in range(250):
+            yield 'Active', number
+        raise ConnectionError('Сбой в конце долгого прогона')
+
+    with pytest.raises(ConnectionError):
+        outputs.control_output(rows(), cli_args('pep', 'file'))
+    lines = next((tmp_path / 'results').glob('*.csv')).read_text(
+        encoding='utf-8'
+    ).splitlines()
+    assert len(lines) == 251, (
+        'Строки, полученные до сбоя режима, должны остаться в файле'
+    )
+
+
+def test_pretty_output_generator(capsys):
+    rows = iter([('Status', 'Quantities'), ('Active', 1)])
+    outputs.control_output(rows, cli_args('pep', 'pretty'))
+    captured_out, _ = capsys.readouterr()
+    assert 'Active' in captured_out
+
+
+def test_sqlite_output(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    header = ('Ссылка на документацию', 'Версия', 'Статус')
+    outputs.control_output(
+        [header, ('https://docs.python.org/3.12/', '3.12', 'dev'),
+         ('https://docs.python.org/3.8/', '3.8', 'EOL')],
+        cli_args('latest-versions', 'sqlite')
+    )
+    outputs.control_output(
+        iter([header, ('https://docs.python.org/3.12/', '3.12', 'stable')]),
+        cli_args('latest-versions', 'sqlite')
+    )
+    connection = sqlite3.connect(tmp_path / 'results.sqlite3')
+    assert connection.execute(
+        'SELECT run_id, data FROM results WHERE key = ? ORDER BY run_id',
+        ('3.12',)
+    ).fetchall() == [
+        (1, '["https://docs.python.org/3.12/", "3.12", "dev"]'),
+        (2, '["https://docs.python.org/3.12/", "3.12", "stable"]'),
+    ], 'История должна хранить строку каждого запуска'
+    assert connection.execute(
+        'SELECT run_id, first_run_id FROM latest WHERE key = ?', ('3.12',)
+    ).fetchall() == [(2, 1)], (
+        'Таблица latest должна обновляться по естественному ключу'
+    )
+    assert connection.execute('SELECT key FROM latest').fetchall() == [
+        ('3.12',)
+    ], 'Ключи, которых нет в последнем запуске, должны удаляться из latest'
+
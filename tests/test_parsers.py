@@ -0,0 +1,123 @@
+import pickle
+
+import pytest
+from conftest import pep_card_page, pep_index_page
+try:
+    from src import parsers
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsers.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsers.py`'
+
+PARSE_MODES = ['full', 'partial', 'xpath']
+WHATS_NEW_PAGE = (
+    '<html><body><div class="related"><ul><li>Nav</li></ul></div>'
+    '<section><h1>What’s New In Python 3.11<a href="#">¶</a></h1>'
+    '<dl class="field-list simple"><dt>Editor<span>:</span></dt>'
+    '<dd><p>Pablo &amp; <em>Guido</em></p></dd></dl>'
+    '<dl><dt>Second</dt></dl></section></body></html>'
+)
+
+
+@pytest.mark.parametrize('parse', PARSE_MODES)
+def test_extract_whats_new(parse):
+    got = parsers.extract_whats_new(WHATS_NEW_PAGE, parse=parse)
+    assert got == (
+        'What’s New In Python 3.11¶', 'Editor:Pablo & Guido'
+    ), f'Разбор `{parse}` должен совпадать с полным разбором страницы'
+
+
+@pytest.mark.parametrize('parse', PARSE_MODES)
+def test_extract_pep_status(parse):
+    got = parsers.extract_pep_status(pep_card_page('Final'), parse=parse)
+    assert got == 'Final', (
+        f'Разбор `{parse}` должен совпадать с полным разбором страницы'
+    )
+
+
+@pytest.mark.parametrize('parse', PARSE_MODES)
+def test_extract_missing_tag(parse):
+    with pytest.raises(BaseException) as excinfo:
+        parsers.extract_pep_status('<html><h1>PEP</h1></html>', parse=parse)
+    assert excinfo.typename == 'ParserFindTagException'
+
+
+WHATS_NEW_INDEX_PAGE = (
+    '<html><body><div class="toctree-wrapper"><ul><li class="toctree-l1">'
+    '<a href="outside.html">Outside</a></li></ul></div>'
+    '<section id="what-s-new-in-python"><h1>What’s New in Python</h1>'
+    '<div class="toctree-wrapper compound"><ul>'
+    '<li class="toctree-l1"><a class="reference internal" href="3.12.html">'
+    'What’s New In Python 3.12</a><ul><li class="toctree-l2">'
+    '<a href="3.12.html#summary">Summary</a></li></ul></li>'
+    '<!-- <li class="toctree-l1"><a href="3.13.html">3.13</a></li> -->'
+    '<li class="toctree-l1 current"><a href="3.11.html">3.11 &amp; more</a>'
+    '</li></ul></div></section></body></html>'
+)
+SIDEBAR_PAGE = (
+    '<html><body><div class="sphinxsidebar"><div class="sphinxsidebarwrapper">'
+    '<h3>Docs by version</h3><ul><li><a href="https://docs.python.org/3.14/">'
+    'Python 3.14 (in development)</a></li></ul>'
+    '<ul><li><a href="https://docs.python.org/3.13/">Python 3.13 '
+    '(<em>stable</em>)</a></li>\n<li><a href="https://docs.python.org/2.7/">'
+    'Python 2.7 (EOL)</a></li><li><a href="https://www.python.org/doc/'
+    'versions/">All versions</a></li></ul></div></div></body></html>'
+)
+DOWNLOAD_PAGE = (
+    '<html><body><table class="docutils align-default"><tr>'
+    '<td><a href="archives/python-3.12-docs-pdf-letter.zip">PDF</a></td>'
+    '<td><a href="archives/python-3.12-docs-pdf-a4.zip">PDF A4</a></td>'
+    '</tr><tr><td><a href="archives/python-3.12-docs.epub">EPUB</a></td>'
+    '<td><a name="epub">¶</a></td></tr></table>'
+    '<p><a href="archives/other.zip">Other</a></p></body></html>'
+)
+INDEX_PAGES = {
+    'extract_whats_new_links': (
+        WHATS_NEW_INDEX_PAGE, ['3.12.html', '3.11.html']
+    ),
+    'extract_latest_versions': (SIDEBAR_PAGE, [
+        ('https://docs.python.org/3.13/', 'Python 3.13 (stable)'),
+        ('https://docs.python.org/2.7/', 'Python 2.7 (EOL)'),
+        ('https://www.python.org/doc/versions/', 'All versions'),
+    ]),
+    'extract_download_links': (DOWNLOAD_PAGE, [
+        'archives/python-3.12-docs-pdf-letter.zip',
+        'archives/python-3.12-docs-pdf-a4.zip',
+        'archives/python-3.12-docs.epub',
+    ]),
+    'extract_pep_index': (pep_index_page(((1, 'A', ''), (8, '', ''))), [
+        ('1', 'pep-0001/', 'A'), ('8', 'pep-0008/', ''),
+    ]),
+}
+
+
+@pytest.mark.parametrize('parse', PARSE_MODES)
+@pytest.mark.parametrize('name', INDEX_PAGES)
+def test_index_extractors_parity(name, parse):
+    page, expected = INDEX_PAGES[name]
+    extractor = getattr(parsers, name)
+    assert extractor(page, parse=parse) == expected, (
+        f'`{name}` с разбором `{parse}` должна возвращать то же, '
+        'что и разбор BeautifulSoup'
+    )
+
+
+@pytest.mark.parametrize('parse', PARSE_MODES)
+@pytest.mark.parametrize('name, exception', [
+    ('extract_latest_versions', 'ParserFindKeyWordException'),
+    ('extract_download_links', 'ParserFindTagException'),
+    ('extract_pep_index', 'ParserFindTagException'),
+])
+def test_index_extractors_missing(name, exception, parse):
+    with pytest.raises(BaseException) as excinfo:
+        getattr(parsers, name)('<html><h1>Docs</h1></html>', parse=parse)
+    assert excinfo.typename == exception, (
+        f'`{name}` с разбором `{parse}` должна вызывать {exception}'
+    )
+
+
+def test_extractor_pickle():
+    extractor = pickle.loads(pickle.dumps(parsers.extract_pep_status))
+    assert extractor(pep_card_page('Final'), parse='xpath') == 'Final', (
+        'Функции разбора должны передаваться в пул процессов'
+    )
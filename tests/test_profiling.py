@@ -0,0 +1,35 @@
+import pstats
+import re
+from argparse import Namespace
+
+import pytest
+
+try:
+    from src import profiling
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiling.py`'
+
+
+def busy(limit):
+    return sum(len(re.findall(r'\d+', str(number))) for number in range(limit))
+
+
+@pytest.mark.parametrize('kind', ['cprofile', 'sampling'])
+def test_profile_call(monkeypatch, tmp_path, kind):
+    monkeypatch.setattr(profiling, 'LOG_DIR', tmp_path)
+    got = profiling.profile_call(
+        Namespace(mode='pep', profile=kind, profile_top=50), busy, 200000
+    )
+    assert got == 200000, 'Профилировщик должен вернуть результат функции'
+    base = next(tmp_path.glob('profile_pep_*.pstats')).with_suffix('')
+    stats = pstats.Stats(str(base.with_suffix('.pstats')))
+    assert any(name == 'busy' for _, _, name in stats.stats), (
+        f'В pstats ({kind}) должна быть профилируемая функция'
+    )
+    collapsed = base.with_suffix('.collapsed').read_text().splitlines()
+    assert any('busy (test_profiling.py' in line for line in collapsed), (
+        'Свернутые стеки должны содержать профилируемую функцию'
+    )
+    assert 'busy' in base.with_suffix('.txt').read_text()
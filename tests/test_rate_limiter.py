@@ -0,0 +1,60 @@
+import time
+from argparse import Namespace
+try:
+    from src import rate_limiter, transport
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `rate_limiter.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `rate_limiter.py`'
+
+
+def test_token_bucket_rate():
+    limiter = rate_limiter.RateLimiter(rate=10, burst=2)
+    delays = [limiter.reserve('peps.python.org') for _ in range(5)]
+    assert delays[:2] == [0, 0], 'Первые burst запросов идут без ожидания'
+    assert 0.25 < delays[-1] <= 0.3, (
+        'Следующие запросы должны идти с темпом rate запросов в секунду'
+    )
+    assert limiter.reserve('docs.python.org') == 0, (
+        'У каждого хоста своя корзина токенов'
+    )
+
+
+def test_feedback_adapts_rate():
+    limiter = rate_limiter.RateLimiter(rate=10, burst=1, max_rate=11)
+    limiter.feedback('peps.python.org', 200)
+    limiter.feedback('peps.python.org', 200)
+    limiter.feedback('peps.python.org', 200)
+    assert limiter.bucket('peps.python.org').rate == 11
+    limiter.feedback('peps.python.org', 503)
+    assert limiter.bucket('peps.python.org').rate == 5.5, (
+        'При ошибках темп запросов должен снижаться'
+    )
+    limiter.feedback('peps.python.org', 429, retry_after='2')
+    assert limiter.reserve('peps.python.org') > 1.9, (
+        'Планировщик должен соблюдать Retry-After'
+    )
+
+
+def test_parse_retry_after():
+    assert rate_limiter.parse_retry_after('120') == 120
+    assert rate_limiter.parse_retry_after(None) is None
+    assert rate_limiter.parse_retry_after(
+        'Wed, 21 Oct 2015 07:28:00 GMT'
+    ) == 0
+
+
+def test_transport_reports_throttling(local_server, tempfile_session):
+    local_server.pages['/pep-0008/'] = b'PEP 8'
+    local_server.failures['/pep-0008/'] = 1
+    transport.mount_transport(
+        tempfile_session, Namespace(rate=100, retries=2, backoff=0)
+    )
+    limiter = transport.get_rate_limiter(tempfile_session, local_server.url)
+    started = time.monotonic()
+    response = tempfile_session.get(local_server.url + 'pep-0008/')
+    assert response.status_code == 200
+    assert limiter.bucket('127.0.0.1').rate < 100, (
+        'Ответ 503 должен снижать темп запросов к хосту'
+    )
+    assert time.monotonic() - started < 5
@@ -0,0 +1,87 @@
+import io
+import tarfile
+import zipfile
+
+try:
+    from src import search_index
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search_index.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search_index.py`'
+
+ASYNCIO_PAGE = (
+    '<html><head><title>asyncio — Asynchronous I/O</title>'
+    '<script>var TaskGroup = 1;</script></head><body>'
+    '<div class="sphinxsidebar">Navigation TaskGroup</div>'
+    '<div role="main"><h1>asyncio</h1><p>Use TaskGroup to run tasks '
+    'concurrently.</p></div></body></html>'
+)
+
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, text in files.items():
+            archive.writestr(f'python-docs-text/{name}', text)
+
+
+def make_tar(path, files):
+    with tarfile.open(path, 'w:bz2') as archive:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(f'python-docs-html/{name}')
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_index_and_search(tmp_path):
+    connection = search_index.connect(tmp_path / 'search.sqlite3')
+    archive = tmp_path / 'python-3.12.1-docs-text.zip'
+    make_zip(archive, {
+        'library/os.txt': 'os - Miscellaneous interfaces\nos.path.join()',
+        'library/re.txt': 're - Regular expressions\nre.compile()',
+        'README.png': 'binary',
+    })
+    assert search_index.index_archive(
+        connection, archive, 'text.zip', 'sha-1'
+    ) == (2, 0, 0)
+    assert search_index.index_archive(
+        connection, archive, 'text.zip', 'sha-1'
+    ) is None, 'Неизменившийся архив не должен индексироваться повторно'
+    got = search_index.search(connection, ['os.path'], 10)
+    assert [(source, path) for source, path, *_ in got] == [
+        ('text.zip', 'library/os.txt')
+    ], 'Поиск должен находить документ по словам с точками'
+    assert got[0][2] == 'os - Miscellaneous interfaces'
+
+    newer = tmp_path / 'python-3.12.2-docs-text.zip'
+    make_zip(newer, {
+        'library/os.txt': 'os - Miscellaneous interfaces\nos.path.join()',
+        'library/json.txt': 'json - JSON encoder and decoder',
+    })
+    assert search_index.index_archive(
+        connection, newer, 'text.zip', 'sha-2'
+    ) == (1, 1, 1), (
+        'Новый архив должен переиндексировать только изменившиеся документы '
+        'и удалять исчезнувшие'
+    )
+    assert search_index.search(connection, ['compile'], 10) == []
+    assert search_index.search(connection, ['enc*'], 10)[0][1] == (
+        'library/json.txt'
+    )
+
+
+def test_index_html_tar(tmp_path):
+    connection = search_index.connect(tmp_path / 'search.sqlite3')
+    archive = tmp_path / 'python-docs-html.tar.bz2'
+    make_tar(archive, {'library/asyncio.html': ASYNCIO_PAGE})
+    assert search_index.index_archive(
+        connection, archive, 'html.tar.bz2', 'sha'
+    ) == (1, 0, 0)
+    got = search_index.search(connection, ['taskgroup'], 10)
+    assert got[0][2] == 'asyncio — Asynchronous I/O'
+    assert '[TaskGroup]' in got[0][3], (
+        'Фрагмент должен выделять найденные слова'
+    )
+    assert search_index.search(connection, ['Navigation'], 10) == [], (
+        'В индекс HTML должна попадать только основная часть страницы'
+    )
@@ -0,0 +1,70 @@
+from argparse import Namespace
+
+from requests_cache import CachedSession
+
+try:
+    from src import async_utils, snapshots
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+
+
+def test_record_replay(local_server, tempfile_session, tmp_path):
+    local_server.pages['/index.html'] = b'<h1>Python</h1>'
+    url = local_server.url + 'index.html'
+    snapshots.mount_snapshots(tempfile_session, Namespace(record=tmp_path))
+    tempfile_session.get(url)
+    tempfile_session.get(url)
+    assert len(local_server.hits) == 1
+    lines = (tmp_path / 'index.jsonl').read_text().splitlines()
+    assert len(lines) == 1, (
+        'Ответ, полученный из кеша повторно, не должен дублироваться в снимке'
+    )
+
+    replay = snapshots.mount_snapshots(
+        type(tempfile_session)(backend='memory'), Namespace(replay=tmp_path)
+    )
+    response = replay.get(url)
+    assert response.status_code == 200
+    assert response.text == '<h1>Python</h1>'
+    assert replay.get(url + '?missing').status_code == 404, (
+        'На запрос, которого нет в снимке, должен быть ответ 404'
+    )
+    assert len(local_server.hits) == 1, (
+        'При воспроизведении снимка не должно быть запросов к сети'
+    )
+
+
+def test_replay_async(local_server, tempfile_session, tmp_path):
+    local_server.pages['/a.html'] = b'a'
+    url = local_server.url + 'a.html'
+    snapshots.mount_snapshots(tempfile_session, Namespace(record=tmp_path))
+    assert list(async_utils.get_pages_async(tempfile_session, [url])) == [
+        (url, 'a', None)
+    ], 'Движок async должен записывать ответы в снимок'
+    local_server.pages.clear()
+    replay = snapshots.mount_snapshots(
+        type(tempfile_session)(backend='memory'), Namespace(replay=tmp_path)
+    )
+    assert list(async_utils.get_pages_async(replay, [url])) == [
+        (url, 'a', None)
+    ]
+
+
+def test_record_revalidated(local_server, tmp_path):
+    local_server.pages['/index.html'] = b'<h1>Python</h1>'
+    url = local_server.url + 'index.html'
+    session = CachedSession(backend='memory', expire_after=0)
+    session.get(url)
+    snapshots.mount_snapshots(session, Namespace(record=tmp_path))
+    response = session.get(url)
+    assert local_server.hits[-1][1], 'Ответ из кеша должен проверяться (304)'
+    assert response.text == '<h1>Python</h1>'
+    replay = snapshots.mount_snapshots(
+        CachedSession(backend='memory'), Namespace(replay=tmp_path)
+    )
+    response = replay.get(url)
+    assert (response.status_code, response.text) == (200, '<h1>Python</h1>'), (
+        'В снимок должен попадать ответ из кеша, а не 304 при его проверке'
+    )
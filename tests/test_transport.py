@@ -0,0 +1,56 @@
+from argparse import Namespace
+
+try:
+    from src import transport
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `transport.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `transport.py`'
+
+
+def test_mount_transport(tempfile_session):
+    session = transport.mount_transport(
+        tempfile_session,
+        Namespace(
+            pool_size=4, connect_timeout=1, read_timeout=2, retries=2,
+            backoff=0.1, no_keep_alive=True
+        )
+    )
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert isinstance(adapter, transport.TransportAdapter)
+    assert adapter.timeout == (1, 2), (
+        'У каждого запроса сессии должен быть таймаут по умолчанию'
+    )
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+    assert 503 in adapter.max_retries.status_forcelist
+    assert session.headers['Connection'] == 'close'
+    url = 'https://peps.python.org/'
+    assert transport.get_pool_size(session, url) == 4, (
+        'Движок async должен брать размер пула из --pool-size'
+    )
+    assert not transport.keep_alive(session)
+
+
+def test_jitter_retry():
+    retry = transport.JitterRetry(total=5, backoff_factor=1)
+    for _ in range(4):
+        retry = retry.increment(method='GET', url='/')
+    for _ in range(100):
+        assert 0 <= retry.get_backoff_time() <= 8, (
+            'Задержка повтора должна быть случайной в пределах '
+            'экспоненциальной границы'
+        )
+
+
+def test_retries_on_5xx(local_server, tempfile_session):
+    local_server.pages['/pep-0008/'] = b'PEP 8'
+    local_server.failures['/pep-0008/'] = 2
+    transport.mount_transport(
+        tempfile_session, Namespace(retries=3, backoff=0.01)
+    )
+    response = tempfile_session.get(local_server.url + 'pep-0008/')
+    assert response.status_code == 200, (
+        'Ответы 5xx должны повторяться с задержкой'
+    )
+    assert len(local_server.hits) == 3
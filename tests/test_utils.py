@@ -1,3 +1,5 @@
+import time
+
 import pytest
 import requests
 import requests_mock
@@ -54,3 +56,49 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_extract_pages():
+    pages = [
+        ('a', 'first', None),
+        ('b', None, ConnectionError('b')),
+        ('c', 'third', None),
+    ]
+    for processes in (0, 2):
+        got = list(utils.extract_pages(str.upper, pages, processes))
+        assert [(url, record) for url, record, _ in got] == [
+            ('a', 'FIRST'), ('b', None), ('c', 'THIRD')
+        ], (
+            'Функция `extract_pages` должна возвращать записи '
+            'в исходном порядке'
+        )
+        assert isinstance(got[1][2], ConnectionError)
+
+
+def test_extract_pages_bounded():
+    pulled = []
+
+    def pages():
+        for number in range(20):
+            pulled.append(number)
+            yield str(number), 0.2, None
+
+    got = utils.extract_pages(time.sleep, pages(), processes=1)
+    assert next(got) == ('0', None, None)
+    assert len(pulled) <= 2, (
+        'Пока страницы ждут разбора, новые страницы не должны загружаться'
+    )
+    got.close()
+
+
+def test_get_pages_bounded(local_server, tempfile_session):
+    for number in range(20):
+        local_server.pages[f'/pep-{number}/'] = b'<html></html>'
+    urls = [f'{local_server.url}pep-{number}/' for number in range(20)]
+    pages = utils.get_pages(tempfile_session, urls, workers=2)
+    assert next(pages) == (urls[0], '<html></html>', None)
+    time.sleep(0.3)
+    assert len(local_server.hits) <= 5, (
+        'Без потребителя должно загружаться не больше 2 * workers страниц'
+    )
+    pages.close()
@@ -0,0 +1,87 @@
+import json
+from argparse import Namespace
+
+import pytest
+from conftest import pep_index_page
+
+try:
+    from src import watcher
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watcher.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watcher.py`'
+
+
+def sidebar_page(status):
+    return (
+        '<html><body><div class="sphinxsidebarwrapper"><ul>'
+        '<li><a href="/3.13/">Python 3.13 (stable)</a></li>'
+        f'<li><a href="/3.8/">Python 3.8 ({status})</a></li>'
+        '<li><a href="/versions/">All versions</a></li>'
+        '</ul></div></body></html>'
+    ).encode()
+
+
+def test_diff_items():
+    events = watcher.diff_items(
+        {'1': 'A', '2': 'D', '3': 'P'}, {'1': 'A', '2': 'F', '4': ''}
+    )
+    assert events == [
+        {'key': '2', 'change': 'changed', 'old': 'D', 'new': 'F'},
+        {'key': '3', 'change': 'removed', 'old': 'P', 'new': None},
+        {'key': '4', 'change': 'added', 'old': None, 'new': ''},
+    ], 'События должны описывать добавленные, удаленные и измененные ключи'
+
+
+def test_watch_targets():
+    assert list(watcher.watch_targets(Namespace(params=[]))) == [
+        'latest-versions', 'pep'
+    ], 'Без параметров команда watch должна наблюдать за всеми страницами'
+    with pytest.raises(ValueError):
+        watcher.watch_targets(Namespace(params=['whats-new']))
+
+
+def test_run_watch(monkeypatch, tmp_path, capsys, local_server,
+                   tempfile_session):
+    monkeypatch.setattr(watcher, 'BASE_DIR', tmp_path)
+    local_server.pages['/3/'] = sidebar_page('security')
+    local_server.pages['/peps/'] = pep_index_page(
+        ((1, 'A', ''), (8, 'D', ''))
+    ).encode()
+    targets = {
+        name: (local_server.url + path, *watcher.WATCH_TARGETS[name][1:])
+        for name, path in (('latest-versions', '3/'), ('pep', 'peps/'))
+    }
+    events_path = tmp_path / 'events.jsonl'
+    cli_args = Namespace(
+        polls=2, interval=0, events=events_path, cache_max_size=0
+    )
+    assert watcher.run_watch(tempfile_session, cli_args, targets) == 2
+    assert capsys.readouterr().out == '', (
+        'Первый опрос записывает исходное состояние без событий'
+    )
+    etags = [etag for _, etag in local_server.hits]
+    assert len(etags) == 4 and etags[:2] == [None, None] and all(etags[2:]), (
+        'Повторные опросы должны быть условными запросами (If-None-Match)'
+    )
+
+    local_server.pages['/3/'] = sidebar_page('EOL')
+    local_server.pages['/peps/'] = pep_index_page(
+        ((1, 'A', ''), (8, 'F', ''), (9, '', ''))
+    ).encode()
+    cli_args.polls = 1
+    watcher.run_watch(tempfile_session, cli_args, targets)
+    printed = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert [
+        (event['target'], event['key'], event['old'], event['new'])
+        for event in printed
+    ] == [
+        ('latest-versions', '3.8', 'security', 'EOL'),
+        ('pep', '8', 'D', 'F'),
+        ('pep', '9', None, ''),
+    ], 'Наблюдение должно выводить изменения статусов версий и PEP'
+    assert [
+        json.loads(line) for line in events_path.read_text().splitlines()
+    ] == printed, 'События должны дописываться в файл --events'